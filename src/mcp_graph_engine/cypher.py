@@ -4,14 +4,27 @@ Cypher query execution for NetworkX graphs using grand-cypher.
 This module provides:
 1. Query preprocessing to fix common LLM mistakes
 2. Cypher query execution against NetworkX graphs
+3. An LRU cache of results keyed on (graph identity, graph version, query)
 """
 
+import copy
 import re
+import threading
+from collections import OrderedDict
 from typing import Any
 
 import networkx as nx
 from grandcypher import GrandCypher
 
+# Maximum number of cached query results
+CYPHER_CACHE_SIZE = 256
+
+# (graph_id, graph_version, query) -> result dict, least recently used first
+_cypher_cache: OrderedDict[tuple[int, int, str], dict[str, Any]] = OrderedDict()
+
+# Guards _cypher_cache: queries also run on the visualization server's thread
+_cypher_cache_lock = threading.Lock()
+
 
 def preprocess_cypher(query: str) -> tuple[str, list[str]]:
     """
@@ -74,14 +87,35 @@ def preprocess_cypher(query: str) -> tuple[str, list[str]]:
     return query, fixes
 
 
-def execute_cypher_query(nx_graph: nx.DiGraph, query: str) -> dict[str, Any]:
+def _clean_value(val: Any) -> Any:
+    """Clean up edge relation format {(0,0): 'type'} → 'type'."""
+    if isinstance(val, dict) and len(val) == 1:
+        return next(iter(val.values()))
+    return val
+
+
+def execute_cypher_query(
+    nx_graph: nx.DiGraph,
+    query: str,
+    version: int | None = None,
+    graph_id: int | None = None,
+) -> dict[str, Any]:
     """
     Execute a Cypher query against a NetworkX graph.
     Applies preprocessing to fix common LLM mistakes.
 
+    When a graph version is given (see GraphEngine.version), results are cached
+    per (graph_id, version, query) so repeated queries against an unchanged graph
+    skip parsing and execution. The version alone doesn't identify a graph: if
+    the package is imported under two names, each copy counts versions on its
+    own. Callers always receive their own copy of the result.
+
     Args:
         nx_graph: NetworkX DiGraph to query
         query: Cypher query string (may use non-standard syntax)
+        version: Optional version of the graph contents, enables result caching
+        graph_id: Identity of the graph the version belongs to, e.g.
+            id(engine.graph); defaults to id(nx_graph)
 
     Returns:
         Dict with:
@@ -94,6 +128,31 @@ def execute_cypher_query(nx_graph: nx.DiGraph, query: str) -> dict[str, Any]:
         - count: int - number of rows (on success)
         - error: str - error message (on failure)
     """
+    if version is None:
+        return _run_cypher_query(nx_graph, query)
+
+    if graph_id is None:
+        graph_id = id(nx_graph)
+
+    key = (graph_id, version, query)
+    with _cypher_cache_lock:
+        result = _cypher_cache.get(key)
+        if result is not None:
+            _cypher_cache.move_to_end(key)
+
+    if result is None:
+        # Run outside the lock so a slow query doesn't block other threads
+        result = _run_cypher_query(nx_graph, query)
+        with _cypher_cache_lock:
+            _cypher_cache[key] = result
+            if len(_cypher_cache) > CYPHER_CACHE_SIZE:
+                _cypher_cache.popitem(last=False)
+
+    return copy.deepcopy(result)
+
+
+def _run_cypher_query(nx_graph: nx.DiGraph, query: str) -> dict[str, Any]:
+    """Preprocess and execute a Cypher query (uncached)."""
     original_query = query
 
     # Preprocess to fix common LLM mistakes
@@ -117,19 +176,14 @@ def execute_cypher_query(nx_graph: nx.DiGraph, query: str) -> dict[str, Any]:
 
         # Clean column names (remove Token wrapper if present)
         columns = [str(k) if not hasattr(k, 'value') else k.value for k in result.keys()]
-        raw_columns = list(result.keys())
-        num_rows = len(next(iter(result.values())))
-
-        rows = []
-        for i in range(num_rows):
-            row = {}
-            for col_name, raw_col in zip(columns, raw_columns, strict=True):
-                val = result[raw_col][i]
-                # Clean up edge relation format {(0,0): 'type'} → 'type'
-                if isinstance(val, dict) and len(val) == 1:
-                    val = next(iter(val.values()))
-                row[col_name] = val
-            rows.append(row)
+        # Resolve each column's value list once, then build rows column-wise
+        column_values = list(result.values())
+        num_rows = len(column_values[0])
+
+        rows = [
+            dict(zip(columns, map(_clean_value, values), strict=True))
+            for values in zip(*column_values, strict=True)
+        ]
 
         return {
             "success": True,
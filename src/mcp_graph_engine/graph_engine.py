@@ -1,9 +1,12 @@
 """Graph engine wrapping NetworkX with high-level operations."""
 
 import csv
+import itertools
 import json
 import logging
-from collections.abc import Callable
+import math
+import re
+from collections.abc import Callable, Iterable
 from io import StringIO
 from typing import Any
 
@@ -12,8 +15,78 @@ import numpy as np
 
 from .matcher import Matcher, get_embedding_model
 
+# CSV edge list columns, and characters that force csv.writer to quote a field
+_CSV_HEADER = ('source', 'target', 'relation')
+_CSV_SPECIAL_CHARS = re.compile(r'[,"\r\n]')
+
+# Use orjson for JSON import/export if available (optional dependency)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Source of graph versions. Shared across engines so a (version, query) pair
+# can never refer to two different graphs.
+_version_counter = itertools.count()
+
+
+def _needs_stdlib_json(value: Any) -> bool:
+    """
+    Check whether a value holds floats orjson would write differently from json.
+
+    orjson writes NaN and Infinity as null, and uses its own exponent notation,
+    so such floats must go through json.dumps to round-trip and stay identical.
+
+    Args:
+        value: JSON-ready value (dicts, lists and scalars)
+
+    Returns:
+        True if json.dumps must be used for this value
+    """
+    if isinstance(value, float):
+        # repr switches to exponent notation outside [1e-4, 1e16)
+        return not math.isfinite(value) or (value != 0 and not 1e-4 <= abs(value) < 1e16)
+    if isinstance(value, dict):
+        return any(_needs_stdlib_json(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_needs_stdlib_json(v) for v in value)
+    return False
+
+
+def _dot_quote(value: Any) -> str:
+    """Quote a value as a DOT ID, escaping embedded double quotes."""
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+def _read_csv_rows(content: str) -> tuple[list[str], Iterable[dict[str, Any]]]:
+    """
+    Split CSV content into its header and row dicts.
+
+    Content without quotes or carriage returns is split directly on newlines
+    and commas, which gives the same rows as csv.DictReader without its
+    per-row overhead. Anything else goes through csv.DictReader.
+
+    Args:
+        content: CSV text with a header row
+
+    Returns:
+        Tuple of (fieldnames, rows), where missing trailing fields are None
+    """
+    if '"' in content or '\r' in content:
+        reader = csv.DictReader(StringIO(content))
+        return reader.fieldnames or [], reader
+
+    header, *lines = content.split('\n')
+    fieldnames = header.split(',') if header else []
+    rows = (
+        dict(itertools.zip_longest(fieldnames, line.split(',')))
+        for line in lines if line
+    )
+    return fieldnames, rows
+
 
 class GraphEngine:
     """Wrapper around NetworkX DiGraph with MCP-friendly operations."""
@@ -35,6 +108,16 @@ class GraphEngine:
         self.embeddings = embeddings if embeddings is not None else {}
         self.matcher = Matcher(self.embeddings)
         self._on_mutation = on_mutation
+        self._version = next(_version_counter)
+
+    @property
+    def version(self) -> int:
+        """Version of the graph contents; changes whenever the graph is mutated."""
+        return self._version
+
+    def _mark_changed(self) -> None:
+        """Advance the graph version so cached query results are invalidated."""
+        self._version = next(_version_counter)
 
     def _notify_mutation(self, mutation_type: str, **kwargs) -> None:
         """
@@ -77,6 +160,10 @@ class GraphEngine:
         attrs['label'] = label
 
         self.graph.add_node(label, **attrs)
+        self._mark_changed()
+
+        if created:
+            self.matcher.add_label(label)
 
         # Compute and cache embedding for new nodes
         if created and label not in self.embeddings:
@@ -157,6 +244,8 @@ class GraphEngine:
         edges_removed = self.graph.in_degree(label) + self.graph.out_degree(label)
 
         self.graph.remove_node(label)
+        self.matcher.remove_label(label)
+        self._mark_changed()
 
         # Notify of mutation
         self._notify_mutation("node_removed", node_id=label)
@@ -245,6 +334,32 @@ class GraphEngine:
 
         return {'matches': matches}
 
+    def _resolve_edge_endpoint(self, label: str, role: str) -> str:
+        """
+        Resolve an edge endpoint to an existing node label.
+
+        Args:
+            label: Node label to resolve (will be fuzzy matched)
+            role: "Source" or "Target", used in the error message
+
+        Returns:
+            The matched node label
+
+        Raises:
+            ValueError: If no node matches the label
+        """
+        if label in self.graph:
+            return label
+
+        existing_nodes = list(self.graph.nodes())
+        match = self.matcher.find_match(label, existing_nodes)
+        if not match.matched_label:
+            available = ", ".join(existing_nodes[:5])
+            if len(existing_nodes) > 5:
+                available += f", ... ({len(existing_nodes)} total nodes)"
+            raise ValueError(f"{role} node '{label}' not found. Available nodes: {available}. Use find_node to search.")
+        return match.matched_label
+
     def add_edge(
         self,
         source: str,
@@ -267,38 +382,26 @@ class GraphEngine:
         Raises:
             ValueError: If source or target nodes don't exist (no match found)
         """
-        # Match source node
-        existing_nodes = list(self.graph.nodes())
-        if not existing_nodes:
+        if not self.graph:
             raise ValueError("Cannot add edge: graph is empty. Add nodes first with add_node or add_nodes.")
 
-        source_match = self.matcher.find_match(source, existing_nodes)
-        if not source_match.matched_label:
-            available = ", ".join(existing_nodes[:5])
-            if len(existing_nodes) > 5:
-                available += f", ... ({len(existing_nodes)} total nodes)"
-            raise ValueError(f"Source node '{source}' not found. Available nodes: {available}. Use find_node to search.")
-
-        # Match target node
-        target_match = self.matcher.find_match(target, existing_nodes)
-        if not target_match.matched_label:
-            available = ", ".join(existing_nodes[:5])
-            if len(existing_nodes) > 5:
-                available += f", ... ({len(existing_nodes)} total nodes)"
-            raise ValueError(f"Target node '{target}' not found. Available nodes: {available}. Use find_node to search.")
-
-        source_matched = source_match.matched_label
-        target_matched = target_match.matched_label
+        # Labels already in the graph resolve exactly; only fall back to the
+        # matcher (and its O(N) node list) for labels that need fuzzy matching
+        source_matched = self._resolve_edge_endpoint(source, "Source")
+        target_matched = self._resolve_edge_endpoint(target, "Target")
 
         # Check if edge already exists
         created = not self.graph.has_edge(source_matched, target_matched)
 
-        # Prepare edge attributes
-        attrs = {'relation': relation}
+        # Without properties (e.g. every fact and Mermaid edge), pass the
+        # relation as the only keyword rather than building and unpacking a dict
         if properties:
+            attrs = {'relation': relation}
             attrs.update(properties)
-
-        self.graph.add_edge(source_matched, target_matched, **attrs)
+            self.graph.add_edge(source_matched, target_matched, **attrs)
+        else:
+            self.graph.add_edge(source_matched, target_matched, relation=relation)
+        self._mark_changed()
 
         edge_data = {
             'source': source_matched,
@@ -388,6 +491,7 @@ class GraphEngine:
         edge_relation = edge_data.get('relation') if edge_data else None
 
         self.graph.remove_edge(source_matched, target_matched)
+        self._mark_changed()
 
         # Notify of mutation
         self._notify_mutation("edge_removed", edge={
@@ -686,10 +790,23 @@ class GraphEngine:
         if self.graph.number_of_nodes() == 0:
             return {"components": [], "count": 0}
 
-        # Use weakly_connected_components for directed graphs
-        components = list(nx.weakly_connected_components(self.graph))
-        # Convert sets to sorted lists for consistent output
-        components_lists = [sorted(list(comp)) for comp in components]
+        # Isolated nodes are singleton components; emit them without a traversal
+        isolates = [node for node, degree in self.graph.degree() if degree == 0]
+        components_lists = [[node] for node in isolates]
+
+        # Use weakly_connected_components for the rest, stopping as soon as every
+        # connected node has been assigned so trailing isolates don't start a BFS
+        remaining = self.graph.number_of_nodes() - len(isolates)
+        if remaining:
+            isolate_set = set(isolates)
+            for comp in nx.weakly_connected_components(self.graph):
+                if len(comp) == 1 and not comp.isdisjoint(isolate_set):
+                    continue
+                # Convert sets to sorted lists for consistent output
+                components_lists.append(sorted(comp))
+                remaining -= len(comp)
+                if remaining == 0:
+                    break
         # Sort by size descending, then alphabetically by first node
         components_lists.sort(key=lambda x: (-len(x), x[0] if x else ""))
 
@@ -740,6 +857,8 @@ class GraphEngine:
                 # Remove the redundant edges but preserve edge attributes for remaining edges
                 for src, tgt in edges_to_remove:
                     self.graph.remove_edge(src, tgt)
+                if edges_to_remove:
+                    self._mark_changed()
 
             return {"edges_removed": edges_removed_count}
         except Exception as e:
@@ -939,14 +1058,14 @@ class GraphEngine:
 
     def _import_csv(self, content: str):
         """Import from CSV edge list format."""
-        reader = csv.DictReader(StringIO(content))
+        fieldnames, rows = _read_csv_rows(content)
 
         # Validate headers
-        if not reader.fieldnames or 'source' not in reader.fieldnames or 'target' not in reader.fieldnames:
-            available = ", ".join(reader.fieldnames) if reader.fieldnames else "none"
+        if not fieldnames or 'source' not in fieldnames or 'target' not in fieldnames:
+            available = ", ".join(fieldnames) if fieldnames else "none"
             raise ValueError(f"CSV must have 'source' and 'target' columns. Found columns: {available}")
 
-        for row in reader:
+        for row in rows:
             source = row['source'].strip()
             target = row['target'].strip()
             relation = row.get('relation', 'edge').strip()
@@ -984,7 +1103,14 @@ class GraphEngine:
     def _import_json(self, content: str):
         """Import from JSON format."""
         try:
-            data = json.loads(content)
+            if ORJSON_AVAILABLE:
+                try:
+                    data = orjson.loads(content)
+                except orjson.JSONDecodeError:
+                    # orjson rejects NaN/Infinity, which json.dumps writes
+                    data = json.loads(content)
+            else:
+                data = json.loads(content)
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse JSON: {str(e)}") from e
 
@@ -1061,41 +1187,46 @@ class GraphEngine:
             raise ValueError(f"Export failed ({format} format): {str(e)}") from e
 
     def _export_dot(self) -> str:
-        """Export to DOT format using pydot."""
-        import pydot
-
-        # Create pydot graph
-        pydot_graph = pydot.Dot(graph_type='digraph')
+        """Export to DOT format, emitting the text directly."""
+        lines = ["digraph G {"]
 
         # Add nodes
         for node, attrs in self.graph.nodes(data=True):
             node_type = attrs.get('type')
-            pydot_node = pydot.Node(node)
             if node_type:
-                pydot_node.set('type', node_type)
-            pydot_graph.add_node(pydot_node)
+                lines.append(f"{_dot_quote(node)} [type={_dot_quote(node_type)}];")
+            else:
+                lines.append(f"{_dot_quote(node)};")
 
         # Add edges
         for source, target, attrs in self.graph.edges(data=True):
             relation = attrs.get('relation', 'edge')
-            pydot_edge = pydot.Edge(source, target, label=relation)
-            pydot_graph.add_edge(pydot_edge)
+            lines.append(
+                f"{_dot_quote(source)} -> {_dot_quote(target)} [label={_dot_quote(relation)}];"
+            )
 
-        return pydot_graph.to_string()
+        lines.append("}")
+        return "\n".join(lines) + "\n"
 
     def _export_csv(self) -> str:
         """Export to CSV edge list format."""
-        output = StringIO()
-        writer = csv.DictWriter(output, fieldnames=['source', 'target', 'relation'])
-        writer.writeheader()
+        rows = [
+            (source, target, attrs.get('relation', 'edge'))
+            for source, target, attrs in self.graph.edges(data=True)
+        ]
+
+        # Plain string fields need no quoting, so rows can be joined directly
+        # (with csv's \r\n line endings). Anything else goes through csv.writer.
+        if all(
+            isinstance(field, str) and not _CSV_SPECIAL_CHARS.search(field)
+            for row in rows for field in row
+        ):
+            return "".join(f"{','.join(row)}\r\n" for row in [_CSV_HEADER, *rows])
 
-        for source, target, attrs in self.graph.edges(data=True):
-            relation = attrs.get('relation', 'edge')
-            writer.writerow({
-                'source': source,
-                'target': target,
-                'relation': relation
-            })
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(_CSV_HEADER)
+        writer.writerows(rows)
 
         return output.getvalue()
 
@@ -1103,6 +1234,8 @@ class GraphEngine:
         """Export to GraphML format using NetworkX."""
         from io import BytesIO
         output = BytesIO()
+        # With lxml installed (speedups extra) this streams elements through
+        # lxml.etree.xmlfile; otherwise NetworkX builds an ElementTree first
         nx.write_graphml(self.graph, output)
         return output.getvalue().decode('utf-8')
 
@@ -1137,7 +1270,15 @@ class GraphEngine:
                 edge_data['properties'] = properties
             data['edges'].append(edge_data)
 
-        return json.dumps(data, indent=2)
+        if ORJSON_AVAILABLE and not _needs_stdlib_json(data):
+            try:
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+            except TypeError:
+                # Values orjson can't serialize natively (e.g. ints beyond
+                # 64 bits); let json try
+                pass
+        # ensure_ascii=False writes non-ASCII text as-is, like orjson
+        return json.dumps(data, indent=2, ensure_ascii=False)
 
     def _sanitize_node_id(self, label: str) -> str:
         """Generate valid Mermaid node ID from label."""
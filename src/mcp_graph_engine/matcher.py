@@ -19,6 +19,10 @@ MATCHING_CONFIG = {
     "embedding_model": "all-MiniLM-L6-v2",
 }
 
+# Patterns used by Matcher._normalize (compiled once, reused on every call)
+_PUNCTUATION_RE = re.compile(r'[^a-z0-9\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
 # Module-level singleton for the embedding model (loaded lazily, shared across all instances)
 _embedding_model = None
 
@@ -60,6 +64,26 @@ class Matcher:
             embeddings: Optional dict mapping node labels to embedding vectors
         """
         self.embeddings = embeddings or {}
+        # Cache of label -> normalized label, filled as nodes are added
+        self._normalized_labels: dict[str, str] = {}
+
+    def add_label(self, label: str) -> None:
+        """
+        Precompute the normalized form of a label so lookups don't redo it.
+
+        Args:
+            label: Node label that was added to the graph
+        """
+        self._normalized_labels[label] = self._normalize(label)
+
+    def remove_label(self, label: str) -> None:
+        """
+        Drop the cached normalized form of a label.
+
+        Args:
+            label: Node label that was removed from the graph
+        """
+        self._normalized_labels.pop(label, None)
 
     def find_match(self, query: str, existing_labels: list[str]) -> MatchResult:
         """
@@ -78,9 +102,12 @@ class Matcher:
 
         # Step 2: Normalized match
         normalized_query = self._normalize(query)
+        normalized_labels = self._normalized_labels
 
         for label in existing_labels:
-            normalized_label = self._normalize(label)
+            normalized_label = normalized_labels.get(label)
+            if normalized_label is None:
+                normalized_label = normalized_labels[label] = self._normalize(label)
             if normalized_query == normalized_label:
                 return MatchResult(matched_label=label, exact=False, similarity=1.0)
 
@@ -205,9 +232,9 @@ class Matcher:
         # Strip leading/trailing whitespace
         text = text.strip()
         # Remove punctuation (keep only alphanumeric and spaces)
-        text = re.sub(r'[^a-z0-9\s]', '', text)
+        text = _PUNCTUATION_RE.sub('', text)
         # Collapse multiple spaces to single space
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # Remove remaining spaces for final comparison
         text = text.replace(' ', '')
 
@@ -1,13 +1,20 @@
 """MCP Graph Engine server with stdio transport."""
 
 import atexit
+import functools
+import heapq
+import itertools
 import json
 import logging
 import os
 import re
 import shlex
 import signal
-from collections.abc import Sequence
+import sys
+import weakref
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from operator import itemgetter
 from typing import Any
 
 import networkx as nx
@@ -22,9 +29,43 @@ from .visualization.web_server import VisualizationServer
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of distinct Mermaid texts whose parsed facts are cached
+MERMAID_CACHE_SIZE = 256
+
+# Optional Mermaid node label in [], (), or {} (3 groups)
+_MERMAID_LABEL = r'(?:\[([^\]]+)\]|\(([^)]+)\)|\{([^}]+)\})'
+
+# One Mermaid statement at the start of a line; anything after it on the line
+# is ignored. Comment ("%%") and direction ("graph TD", "flowchart LR") lines
+# never match. Groups:
+#   Edge, e.g. "A[Label] -->|rel| B(Label)":
+#     1: source ID, 2-4: optional source label
+#     5: optional |edge label|
+#     6: target ID, 7-9: optional target label
+#   Node-only declaration, e.g. "A[Label]" (stores a display label):
+#     10: node ID, 11-13: node label
+# Arrow types: -->, ---, .->, -.->, ==>, ~~>
+_MERMAID_STATEMENT_RE = re.compile(
+    r'\s*(?!%%|graph |flowchart )(?:'
+    r'(\w+)' + _MERMAID_LABEL + r'?\s*(?:-->|---|\.->|-\.\->|==>|~~>)\s*'
+    r'(?:\|([^|]+)\|)?\s*(\w+)' + _MERMAID_LABEL + r'?'
+    r'|(\w+)' + _MERMAID_LABEL + r')'
+)
+
+# Serializer for tool results, built once. Compact separators keep it on the
+# C encoder (indent forces the pure-Python one) and shrink the text the client
+# has to read; non-ASCII labels are sent as-is rather than \u-escaped.
+_encode_tool_result = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
 # Global reference for cleanup handlers
 _active_server: "GraphServer | None" = None
 
+# Maximum number of graph versions whose dump_context cycle sample is cached
+CYCLE_CACHE_SIZE = 64
+
+# Maximum number of (graph, Mermaid text) imports remembered for replay detection
+MERMAID_RESULT_CACHE_SIZE = 128
+
 
 def remove_comments(line: str) -> str:
     """Remove # comments, but not # inside quoted strings."""
@@ -142,48 +183,64 @@ def parse_mermaid(mermaid: str) -> list[dict[str, str]]:
     Raises:
         ValueError: If the Mermaid syntax is malformed
     """
-    facts = []
-    node_labels = {}  # Map node IDs to their display labels
+    # Fresh dicts per call, so callers may mutate them without touching the cache
+    return [
+        {"from": source, "to": target, "rel": relation}
+        for source, target, relation in _parse_mermaid_cached(mermaid)
+    ]
 
-    for _line_num, line in enumerate(mermaid.split('\n'), start=1):
-        # Strip whitespace
-        line = line.strip()
 
-        # Skip empty lines and comments
-        if not line or line.startswith('%%'):
-            continue
+def _is_mermaid_id(token: str) -> bool:
+    """Whether a token is a bare node ID, i.e. matches the regex's \\w+."""
+    return token.replace('_', 'a').isalnum()
+
+
+def iter_parse_mermaid(mermaid: str) -> Iterator[tuple[str, str, str]]:
+    """Parse Mermaid flowchart syntax lazily, one fact at a time.
+
+    Uncached counterpart of parse_mermaid for streaming large diagrams: facts
+    are yielded as their lines are read, with no list of all facts built.
+
+    Args:
+        mermaid: Multi-line string with Mermaid flowchart syntax
+
+    Yields:
+        (from, to, rel) tuples in diagram order
+    """
+    node_labels = {}  # Map node IDs to their display labels
+
+    for line in mermaid.split('\n'):
+        # Fast path for the common plain edge "A --> B": without labels the
+        # line can be split on whitespace instead of running the regex
+        if '[' not in line and '(' not in line and '{' not in line and '|' not in line:
+            parts = line.split()
+            if (
+                len(parts) == 3
+                and parts[1] in ('-->', '---')
+                and _is_mermaid_id(parts[0])
+                and _is_mermaid_id(parts[2])
+                and parts[0] not in ('graph', 'flowchart')
+            ):
+                source_id, _, target_id = parts
+                yield (
+                    sys.intern(node_labels.get(source_id, source_id)),
+                    sys.intern(node_labels.get(target_id, target_id)),
+                    "relates_to",
+                )
+                continue
 
-        # Skip graph direction declarations
-        if line.startswith('graph ') or line.startswith('flowchart '):
+        match = _MERMAID_STATEMENT_RE.match(line)
+        if match is None:
+            # Blank, comment, direction or unsupported (e.g. style) line
             continue
 
-        # Pattern for edges with various syntax variants
-        # Captures: source_id, source_label, edge_type, edge_label, target_id, target_label
-
-        # Try to match edge patterns (handles multiple arrow styles and labels)
-        # Pattern breakdown:
-        # (\w+) - source node ID
-        # (?:\[([^\]]+)\]|\(([^)]+)\)|\{([^}]+)\})? - optional source label in [], (), or {}
-        # \s* - whitespace
-        # (?:-->|---|-\.-|==>|~~>|--) - arrow type
-        # (?:\|([^|]+)\||--\s*([^-]+?)\s*-->)? - optional edge label (|label| or -- label -->)
-        # \s* - whitespace
-        # (\w+) - target node ID
-        # (?:\[([^\]]+)\]|\(([^)]+)\)|\{([^}]+)\})? - optional target label in [], (), or {}
-
-        # Simplified pattern for basic support
-        # Support different arrow types: -->, ---, -.-, -.->, ==>, ~~>
-        edge_pattern = r'(\w+)(?:\[([^\]]+)\]|\(([^)]+)\)|\{([^}]+)\})?\s*(?:-->|---|\.->|-\.\->|==>|~~>)\s*(?:\|([^|]+)\|)?\s*(\w+)(?:\[([^\]]+)\]|\(([^)]+)\)|\{([^}]+)\})?'
-
-        match = re.match(edge_pattern, line)
-        if match:
-            groups = match.groups()
-            source_id = groups[0]
-            # Source label can be in [], (), or {}
+        groups = match.groups()
+        source_id = groups[0]
+        if source_id is not None:
+            # Edge statement; labels can be in [], (), or {}
             source_label = groups[1] or groups[2] or groups[3]
             edge_label = groups[4]
             target_id = groups[5]
-            # Target label can be in [], (), or {}
             target_label = groups[6] or groups[7] or groups[8]
 
             # Store node labels if provided
@@ -192,33 +249,25 @@ def parse_mermaid(mermaid: str) -> list[dict[str, str]]:
             if target_label:
                 node_labels[target_id] = target_label
 
-            # Determine source and target names (use label if available, else ID)
-            source_name = node_labels.get(source_id, source_id)
-            target_name = node_labels.get(target_id, target_id)
+            # Determine source and target names (use label if available, else ID).
+            # Names and relations repeat across edges, so intern them: every
+            # occurrence then shares one string with a cached hash.
+            source_name = sys.intern(node_labels.get(source_id, source_id))
+            target_name = sys.intern(node_labels.get(target_id, target_id))
 
             # Determine relation (use edge label if available, else default)
-            relation = edge_label.strip() if edge_label else "relates_to"
-
-            # Create fact
-            fact = {
-                "from": source_name,
-                "to": target_name,
-                "rel": relation
-            }
+            relation = sys.intern(edge_label.strip()) if edge_label else "relates_to"
 
-            facts.append(fact)
+            yield source_name, target_name, relation
         else:
-            # Try to match node-only declarations (for storing labels)
-            node_pattern = r'(\w+)(?:\[([^\]]+)\]|\(([^)]+)\)|\{([^}]+)\})'
-            node_match = re.match(node_pattern, line)
-            if node_match:
-                node_id = node_match.group(1)
-                node_label = node_match.group(2) or node_match.group(3) or node_match.group(4)
-                if node_label:
-                    node_labels[node_id] = node_label
-            # Otherwise, skip lines that don't match (could be style declarations, etc.)
+            # Node-only declaration: just store its label
+            node_labels[groups[9]] = groups[10] or groups[11] or groups[12]
 
-    return facts
+
+@functools.lru_cache(maxsize=MERMAID_CACHE_SIZE)
+def _parse_mermaid_cached(mermaid: str) -> tuple[tuple[str, str, str], ...]:
+    """Parse Mermaid text into immutable (from, to, rel) tuples, memoized on the text."""
+    return tuple(iter_parse_mermaid(mermaid))
 
 
 def parse_ask_query(query: str, graph) -> dict[str, Any]:
@@ -479,11 +528,37 @@ def parse_ask_query(query: str, graph) -> dict[str, Any]:
 class GraphServer:
     """MCP server for graph operations."""
 
-    def __init__(self):
+    def __init__(self, preload_mermaid: Iterable[str] = ()):
+        """
+        Initialize the server.
+
+        Args:
+            preload_mermaid: Mermaid diagrams the host expects to import
+                repeatedly. They are parsed once here and never evicted, so
+                create_from_mermaid skips parsing for them.
+        """
         global _active_server
         self.app = Server("mcp-graph-engine")
         self.session_manager = SessionManager(on_mutation=self._handle_graph_mutation)
 
+        # Mermaid text -> parsed (from, to, rel) facts for preloaded diagrams
+        self._preloaded_mermaid: dict[str, tuple[tuple[str, str, str], ...]] = {
+            mermaid: _parse_mermaid_cached(mermaid) for mermaid in preload_mermaid
+        }
+
+        # (id(graph), graph_version, limit) -> sampled cycles, least recently used
+        # first. The version alone doesn't identify a graph: each import of the
+        # graph_engine module counts versions on its own.
+        self._cycle_cache: OrderedDict[tuple[int, int, int], list[list]] = OrderedDict()
+
+        # (graph_name, mermaid) -> (weak reference to the graph, its version after
+        # the import, fact count), least recently used first. The graph itself is
+        # checked because versions from another graph (recreated under the same
+        # name, or from another import of graph_engine) may coincide.
+        self._mermaid_result_cache: OrderedDict[
+            tuple[str, str], tuple[weakref.ref, int, int]
+        ] = OrderedDict()
+
         # Visualization server
         self.vis_server = None
         if os.environ.get('VIS_ENABLED', 'true').lower() == 'true':
@@ -555,6 +630,54 @@ class GraphServer:
             logger.warning(f"Failed to compute critical path: {e}")
             return []
 
+    def _sample_cycles(self, graph: nx.DiGraph, limit: int) -> list[list]:
+        """Find up to `limit` simple cycles, searching one SCC at a time.
+
+        Every cycle lies within a single strongly connected component, so
+        acyclic singleton components (isolated nodes, DAG parts) are skipped
+        without any search.
+
+        Args:
+            graph: NetworkX DiGraph to analyze
+            limit: Maximum number of cycles to return
+
+        Returns:
+            List of cycles, each a list of node labels
+        """
+        cycles = []
+        for component in nx.strongly_connected_components(graph):
+            if len(component) == 1:
+                node = next(iter(component))
+                if not graph.has_edge(node, node):
+                    continue
+            remaining = limit - len(cycles)
+            cycles.extend(itertools.islice(nx.simple_cycles(graph.subgraph(component)), remaining))
+            if len(cycles) >= limit:
+                break
+        return cycles
+
+    def _cached_cycle_sample(self, graph, limit: int) -> list[list]:
+        """Sample up to `limit` cycles of a GraphEngine, memoized on it and its version.
+
+        Args:
+            graph: GraphEngine instance
+            limit: Maximum number of cycles to return
+
+        Returns:
+            List of cycles, each a list of node labels (empty if acyclic)
+        """
+        key = (id(graph), graph.version, limit)
+        cycles = self._cycle_cache.get(key)
+        if cycles is not None:
+            self._cycle_cache.move_to_end(key)
+            return cycles
+
+        cycles = self._sample_cycles(graph.graph, limit)
+        self._cycle_cache[key] = cycles
+        if len(self._cycle_cache) > CYCLE_CACHE_SIZE:
+            self._cycle_cache.popitem(last=False)
+        return cycles
+
     def _handle_graph_mutation(self, graph_name: str, mutation_type: str, **kwargs):
         """Handle graph mutation by broadcasting to visualization clients."""
         if not self.vis_server:
@@ -626,10 +749,57 @@ class GraphServer:
             """Handle tool calls."""
             try:
                 result = await self._handle_tool(name, arguments or {})
-                return [TextContent(type="text", text=json.dumps(result, indent=2))]
+                return [TextContent(type="text", text=_encode_tool_result(result))]
             except Exception as e:
                 error_result = {"error": str(e), "tool": name}
-                return [TextContent(type="text", text=json.dumps(error_result, indent=2))]
+                return [TextContent(type="text", text=_encode_tool_result(error_result))]
+
+    def _apply_facts(
+        self, graph, facts: Iterable[tuple[str, str, str, str, str]]
+    ) -> dict[str, int]:
+        """
+        Add facts to a graph, auto-creating nodes as needed.
+
+        Args:
+            graph: GraphEngine instance
+            facts: (from, to, rel, from_type, to_type) tuples
+
+        Returns:
+            Dict with nodes_created, nodes_existed, edges_created, edges_existed
+        """
+        nodes_created = 0
+        nodes_existed = 0
+        edges_created = 0
+        edges_existed = 0
+
+        for from_label, to_label, relation, from_type, to_type in facts:
+            # Auto-create "from" node if it doesn't exist
+            _, from_created = graph.add_node(from_label, node_type=from_type)
+            if from_created:
+                nodes_created += 1
+            else:
+                nodes_existed += 1
+
+            # Auto-create "to" node if it doesn't exist
+            _, to_created = graph.add_node(to_label, node_type=to_type)
+            if to_created:
+                nodes_created += 1
+            else:
+                nodes_existed += 1
+
+            # Add the edge
+            _, edge_created, _, _ = graph.add_edge(from_label, to_label, relation)
+            if edge_created:
+                edges_created += 1
+            else:
+                edges_existed += 1
+
+        return {
+            "nodes_created": nodes_created,
+            "nodes_existed": nodes_existed,
+            "edges_created": edges_created,
+            "edges_existed": edges_existed
+        }
 
     async def _handle_tool(self, name: str, args: dict) -> Any:
         """Route tool calls to appropriate handlers."""
@@ -640,47 +810,16 @@ class GraphServer:
         # Creation tools
         if name == "add_facts":
             graph = self.session_manager.get_graph(graph_name)
-            facts = args["facts"]
-
-            nodes_created = 0
-            nodes_existed = 0
-            edges_created = 0
-            edges_existed = 0
-
-            for fact in facts:
-                from_label = fact["from"]
-                to_label = fact["to"]
-                relation = fact["rel"]
-                from_type = fact.get("from_type", "entity")
-                to_type = fact.get("to_type", "entity")
-
-                # Auto-create "from" node if it doesn't exist
-                _, from_created = graph.add_node(from_label, node_type=from_type)
-                if from_created:
-                    nodes_created += 1
-                else:
-                    nodes_existed += 1
-
-                # Auto-create "to" node if it doesn't exist
-                _, to_created = graph.add_node(to_label, node_type=to_type)
-                if to_created:
-                    nodes_created += 1
-                else:
-                    nodes_existed += 1
-
-                # Add the edge
-                _, edge_created, _, _ = graph.add_edge(from_label, to_label, relation)
-                if edge_created:
-                    edges_created += 1
-                else:
-                    edges_existed += 1
-
-            return {
-                "nodes_created": nodes_created,
-                "nodes_existed": nodes_existed,
-                "edges_created": edges_created,
-                "edges_existed": edges_existed
-            }
+            return self._apply_facts(graph, (
+                (
+                    fact["from"],
+                    fact["to"],
+                    fact["rel"],
+                    fact.get("from_type", "entity"),
+                    fact.get("to_type", "entity"),
+                )
+                for fact in args["facts"]
+            ))
 
         elif name == "add_knowledge":
             # Parse DSL into facts
@@ -831,15 +970,55 @@ class GraphServer:
         elif name == "create_from_mermaid":
             # Parse Mermaid content into facts
             mermaid = args["mermaid"]
-            facts = parse_mermaid(mermaid)
+            graph = self.session_manager.get_graph(graph_name)
+            facts = self._preloaded_mermaid.get(mermaid)
+            if facts is None:
+                facts = _parse_mermaid_cached(mermaid)
 
-            # Reuse add_facts logic by calling it with parsed facts
-            return await self._handle_tool("add_facts", {"graph": graph_name, "facts": facts})
+            # A diagram without edges (e.g. only "graph TD") adds nothing; skip
+            # the graph and keep it out of the replay cache below
+            if not facts:
+                return {
+                    "nodes_created": 0,
+                    "nodes_existed": 0,
+                    "edges_created": 0,
+                    "edges_existed": 0
+                }
+
+            # Re-importing the same diagram into an unchanged graph is a no-op:
+            # every node and edge already exists, so answer without touching it
+            key = (graph_name, mermaid)
+            cached = self._mermaid_result_cache.get(key)
+            if cached is not None and cached[0]() is graph and cached[1] == graph.version:
+                self._mermaid_result_cache.move_to_end(key)
+                fact_count = cached[2]
+                return {
+                    "nodes_created": 0,
+                    "nodes_existed": 2 * fact_count,
+                    "edges_created": 0,
+                    "edges_existed": fact_count
+                }
+
+            # Feed the parsed (from, to, rel) tuples straight into the add_facts
+            # logic, without building a dict per fact
+            result = self._apply_facts(graph, (
+                (source, target, relation, "entity", "entity")
+                for source, target, relation in facts
+            ))
+
+            self._mermaid_result_cache[key] = (weakref.ref(graph), graph.version, len(facts))
+            self._mermaid_result_cache.move_to_end(key)
+            if len(self._mermaid_result_cache) > MERMAID_RESULT_CACHE_SIZE:
+                self._mermaid_result_cache.popitem(last=False)
+            return result
 
         elif name == "cypher_query":
             query = args["query"]
             graph = self.session_manager.get_graph(graph_name)
-            return execute_cypher_query(graph.graph, query)
+            return execute_cypher_query(
+                graph.graph, query,
+                version=graph.version, graph_id=id(graph.graph)
+            )
 
         elif name == "visualize_graph":
             filter_query = args.get("filter")
@@ -923,12 +1102,13 @@ class GraphServer:
             type_count = len([t for t in node_types if t != 'unknown'])
             lines.append(f"- {type_count} node types: {', '.join(sorted([t for t in node_types if t != 'unknown']))}")
 
-        # Check for cycles
-        cycles_result = graph.find_cycles()
-        has_cycles = cycles_result.get('has_cycles', False)
-        cycle_count = len(cycles_result.get('cycles', []))
+        # Sample a few cycles (enumerating every cycle is exponential); one
+        # extra beyond the 3 listed tells whether more exist. Any cycle at all
+        # shows up in the sample, so it also answers whether the graph has one.
+        cycles = self._cached_cycle_sample(graph, 4)
+        has_cycles = bool(cycles)
         if has_cycles:
-            lines.append(f"- Cycles detected: Yes ({cycle_count} cycles)")
+            lines.append("- Cycles detected: Yes")
         else:
             lines.append("- Cycles detected: No")
 
@@ -943,21 +1123,19 @@ class GraphServer:
         lines.append("## Nodes by Type")
         lines.append("")
 
-        nodes = graph.list_nodes()
-        nodes_by_type = {}
-        for node in nodes:
-            node_type = node.get('type') or 'unknown'
-            if node_type not in nodes_by_type:
-                nodes_by_type[node_type] = []
-            nodes_by_type[node_type].append(node['label'])
+        # Group labels by type in one pass over the node attributes
+        nodes_by_type = defaultdict(list)
+        for label, node_type in graph.graph.nodes(data='type'):
+            nodes_by_type[node_type or 'unknown'].append(label)
 
         # Sort types (put 'unknown' last)
-        sorted_types = sorted([t for t in nodes_by_type.keys() if t != 'unknown'])
+        sorted_types = sorted(t for t in nodes_by_type if t != 'unknown')
         if 'unknown' in nodes_by_type:
             sorted_types.append('unknown')
 
         for node_type in sorted_types:
-            type_nodes = sorted(nodes_by_type[node_type])
+            type_nodes = nodes_by_type[node_type]
+            type_nodes.sort()
             lines.append(f"### {node_type} ({len(type_nodes)} nodes)")
             for node_label in type_nodes:
                 lines.append(f"- {node_label}")
@@ -968,13 +1146,11 @@ class GraphServer:
         lines.append("")
 
         if edge_count > 0:
-            edges = graph.find_edges()
-            # Sort edges for consistency
-            sorted_edges = sorted(edges, key=lambda e: (e['source'], e['target']))
+            # Sort (source, target, relation) tuples once for consistency
+            sorted_edges = sorted(graph.graph.edges(data='relation'), key=itemgetter(0, 1))
 
-            for edge in sorted_edges:
-                relation = edge.get('relation', 'related_to')
-                lines.append(f"- {edge['source']} {relation} {edge['target']}")
+            for source, target, relation in sorted_edges:
+                lines.append(f"- {source} {relation} {target}")
         else:
             lines.append("(No relationships)")
 
@@ -984,40 +1160,28 @@ class GraphServer:
         lines.append("## Key Insights")
         lines.append("")
 
-        # Find most connected nodes using actual degree counts
-        # Calculate actual degrees (not normalized centrality)
+        # One pass over actual degree counts (in + out, not normalized centrality)
+        # yields both the connected nodes and the isolated ones (orphans)
         degree_counts = []
-        for node in nodes:
-            in_degree = graph.graph.in_degree(node['label'])
-            out_degree = graph.graph.out_degree(node['label'])
-            total_degree = in_degree + out_degree
-            if total_degree > 0:  # Only include connected nodes
-                degree_counts.append({
-                    'label': node['label'],
-                    'in_degree': in_degree,
-                    'out_degree': out_degree,
-                    'total': total_degree
-                })
-
-        # Sort by total degree
-        degree_counts.sort(key=lambda x: x['total'], reverse=True)
-
-        if degree_counts:
-            top_node = degree_counts[0]
-            lines.append(f"- Most connected: {top_node['label']} ({top_node['total']} connections)")
+        orphans = []
+        for label, total_degree in graph.graph.degree():
+            if total_degree > 0:
+                degree_counts.append((label, total_degree))
+            else:
+                orphans.append(label)
+
+        # Top 3 by total degree (stable for ties, like a full sort)
+        top_connected = heapq.nlargest(3, degree_counts, key=itemgetter(1))
+
+        if top_connected:
+            top_label, top_total = top_connected[0]
+            lines.append(f"- Most connected: {top_label} ({top_total} connections)")
 
             # List hubs (nodes with >= 2 total connections)
-            hubs = [r['label'] for r in degree_counts[:3] if r['total'] >= 2]
+            hubs = [label for label, total in top_connected if total >= 2]
             if len(hubs) > 1:
                 lines.append(f"- Hubs: {', '.join(hubs)}")
 
-        # Find isolated nodes (orphans)
-        orphans = []
-        for node in nodes:
-            neighbors = graph.get_neighbors(node['label'], direction="both")
-            if not neighbors:
-                orphans.append(node['label'])
-
         if orphans:
             lines.append(f"- Isolated nodes: {', '.join(sorted(orphans))}")
         else:
@@ -1025,13 +1189,13 @@ class GraphServer:
 
         # List cycles if they exist
         if has_cycles:
-            cycles = cycles_result.get('cycles', [])
+            # Show first 3 cycles
             lines.append("- Cycles:")
-            for cycle in cycles[:3]:  # Show first 3 cycles
+            for cycle in cycles[:3]:
                 cycle_str = ' -> '.join(cycle + [cycle[0]])
                 lines.append(f"  - {cycle_str}")
             if len(cycles) > 3:
-                lines.append(f"  - ... and {len(cycles) - 3} more")
+                lines.append("  - ... and more")
 
         return {"context": "\n".join(lines)}
 
@@ -91,6 +91,10 @@ class SessionManager:
             return True
         return False
 
+    def clear(self) -> None:
+        """Delete every graph session."""
+        self.graphs.clear()
+
     def get_graph_info(self, name: str = "default") -> dict[str, Any]:
         """
         Get detailed information about a graph.
@@ -122,7 +122,10 @@ class VisualizationServer:
         if not filter_query:
             return self._export_for_d3(graph)
 
-        result = execute_cypher_query(graph.graph, filter_query)
+        result = execute_cypher_query(
+            graph.graph, filter_query,
+            version=graph.version, graph_id=id(graph.graph)
+        )
         logger.debug(f"Cypher filter query: {filter_query}")
         logger.debug(f"Cypher result: success={result.get('success')}, count={result.get('count')}, rows={result.get('rows', [])[:3]}")
 
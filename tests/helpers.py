@@ -0,0 +1,116 @@
+"""Shared helpers for building test graphs."""
+
+import json
+from typing import Any
+
+from src.mcp_graph_engine.graph_engine import GraphEngine
+
+# Use orjson for test payloads if available, like the engine does
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def build_graph(
+    nodes: list[str | tuple[str, str]],
+    edges: list[tuple[str, str, str]] | None = None
+) -> GraphEngine:
+    """
+    Build a GraphEngine in one batch of nodes and one batch of edges.
+
+    Args:
+        nodes: Node labels, or (label, type) tuples for typed nodes
+        edges: Optional (source, target, relation) tuples
+
+    Returns:
+        GraphEngine containing the given nodes and edges
+    """
+    engine = GraphEngine()
+
+    node_dicts = []
+    for node in nodes:
+        if isinstance(node, tuple):
+            label, node_type = node
+            node_dicts.append({"label": label, "type": node_type})
+        else:
+            node_dicts.append({"label": node})
+    engine.add_nodes(node_dicts)
+
+    if edges:
+        _, failed = engine.add_edges([
+            {"source": source, "target": target, "relation": relation}
+            for source, target, relation in edges
+        ])
+        assert not failed, f"build_graph could not add edges: {failed}"
+
+    return engine
+
+
+def assert_contains_all(text: str, needles: list[str]) -> None:
+    """
+    Assert that every needle occurs in text, reporting all missing ones at once.
+
+    Args:
+        text: Text to search (e.g. a dump_context result)
+        needles: Substrings that must all be present
+    """
+    missing = [needle for needle in needles if needle not in text]
+    assert not missing, f"Missing from output: {missing}"
+
+
+def line_set(text: str) -> set[str]:
+    """
+    Split exported text into a set of stripped lines for membership asserts.
+
+    Args:
+        text: Exported content (e.g. Mermaid or DOT)
+
+    Returns:
+        Set of lines with surrounding whitespace removed
+    """
+    return {line.strip() for line in text.splitlines()}
+
+
+def edge_relations(graph: GraphEngine) -> dict[tuple[str, str], str]:
+    """
+    Snapshot a graph's edges for one-shot comparison in asserts.
+
+    Args:
+        graph: GraphEngine to read
+
+    Returns:
+        Dict mapping (source, target) to the edge's relation
+    """
+    return {(source, target): relation for source, target, relation in graph.graph.edges(data='relation')}
+
+
+def dump_json(data: Any) -> bytes:
+    """
+    Serialize a test payload to compact UTF-8 JSON.
+
+    Args:
+        data: JSON-serializable payload
+
+    Returns:
+        Encoded JSON, ready for Path.write_bytes (decode it for inline content)
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def load_json(content: str | bytes) -> Any:
+    """
+    Parse JSON produced by an export.
+
+    Args:
+        content: JSON text or UTF-8 bytes
+
+    Returns:
+        Parsed payload
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
@@ -3,6 +3,7 @@
 import pytest
 from src.mcp_graph_engine.graph_engine import GraphEngine
 from src.mcp_graph_engine.session import SessionManager
+from tests.helpers import build_graph
 
 
 class TestBasicGraphOperations:
@@ -37,24 +38,16 @@ class TestBasicGraphOperations:
 
     def test_remove_node_with_edges(self):
         """Test that removing a node also removes its edges."""
-        engine = GraphEngine()
-        engine.add_node("A")
-        engine.add_node("B")
-        engine.add_node("C")
-        engine.add_edge("A", "B", "connects")
-        engine.add_edge("B", "C", "links")
-        
+        engine = build_graph(["A", "B", "C"], [("A", "B", "connects"), ("B", "C", "links")])
+
         success, edges_removed = engine.remove_node("B")
         assert success is True
         assert edges_removed == 2  # One in, one out
 
     def test_list_nodes_with_filter(self):
         """Test listing nodes with type filter."""
-        engine = GraphEngine()
-        engine.add_node("A", "class")
-        engine.add_node("B", "function")
-        engine.add_node("C", "class")
-        
+        engine = build_graph([("A", "class"), ("B", "function"), ("C", "class")])
+
         classes = engine.list_nodes(type_filter="class")
         assert len(classes) == 2
         assert all(n["type"] == "class" for n in classes)
@@ -71,22 +64,25 @@ class TestEdgeOperations:
 
     def test_add_edge_with_fuzzy_matching(self):
         """Test that fuzzy matching works for edges."""
-        engine = GraphEngine()
-        engine.add_node("AuthService")
-        engine.add_node("UserRepo")
-        
+        engine = build_graph(["AuthService", "UserRepo"])
+
         # Fuzzy match should find the nodes
         edge_data, created, src, tgt = engine.add_edge("auth service", "user repo", "uses")
         assert src == "AuthService"
         assert tgt == "UserRepo"
         assert created is True
 
+    def test_fuzzy_matching_after_node_removed(self):
+        """Test that removed nodes are no longer fuzzy matched."""
+        engine = build_graph(["AuthService", "UserRepo"])
+        engine.remove_node("AuthService")
+
+        assert engine.find_node("auth service") == {"matches": []}
+
     def test_add_edge_missing_node_error(self):
         """Test that missing nodes give helpful error message."""
-        engine = GraphEngine()
-        engine.add_node("A")
-        engine.add_node("B")
-        
+        engine = build_graph(["A", "B"])
+
         with pytest.raises(ValueError, match="not found.*Available.*Use find_node"):
             engine.add_edge("A", "NonExistent", "connects")
 
@@ -104,32 +100,24 @@ class TestPathFinding:
 
     def test_shortest_path_basic(self):
         """Test shortest path between nodes."""
-        engine = GraphEngine()
-        engine.add_node("A")
-        engine.add_node("B")
-        engine.add_node("C")
-        engine.add_edge("A", "B", "connects")
-        engine.add_edge("B", "C", "connects")
-        
+        engine = build_graph(["A", "B", "C"], [("A", "B", "connects"), ("B", "C", "connects")])
+
         result = engine.shortest_path("A", "C")
         assert result["path"] == ["A", "B", "C"]
         assert result["length"] == 2
 
     def test_shortest_path_self_loop(self):
         """Test shortest path from node to itself."""
-        engine = GraphEngine()
-        engine.add_node("A")
-        
+        engine = build_graph(["A"])
+
         result = engine.shortest_path("A", "A")
         assert result["path"] == ["A"]
         assert result["length"] == 0
 
     def test_shortest_path_no_path_exists(self):
         """Test shortest path when nodes are disconnected."""
-        engine = GraphEngine()
-        engine.add_node("A")
-        engine.add_node("B")
-        
+        engine = build_graph(["A", "B"])
+
         result = engine.shortest_path("A", "B")
         assert result["path"] is None
         assert "disconnected" in result["reason"].lower()
@@ -143,19 +131,14 @@ class TestPathFinding:
 
     def test_all_paths_multiple(self):
         """Test finding all paths between nodes."""
-        engine = GraphEngine()
         # Create diamond: A -> B -> D, A -> C -> D
-        engine.add_nodes([
-            {"label": "A"},
-            {"label": "B"},
-            {"label": "C"},
-            {"label": "D"}
+        engine = build_graph(["A", "B", "C", "D"], [
+            ("A", "B", "path1"),
+            ("A", "C", "path2"),
+            ("B", "D", "path1"),
+            ("C", "D", "path2"),
         ])
-        engine.add_edge("A", "B", "path1")
-        engine.add_edge("A", "C", "path2")
-        engine.add_edge("B", "D", "path1")
-        engine.add_edge("C", "D", "path2")
-        
+
         result = engine.all_paths("A", "D")
         assert result["count"] == 2
         assert ["A", "B", "D"] in result["paths"]
@@ -167,10 +150,7 @@ class TestAnalysisTools:
 
     def test_pagerank_basic(self):
         """Test PageRank calculation."""
-        engine = GraphEngine()
-        engine.add_nodes([{"label": "A"}, {"label": "B"}, {"label": "C"}])
-        engine.add_edge("A", "C", "links")
-        engine.add_edge("B", "C", "links")
+        engine = build_graph(["A", "B", "C"], [("A", "C", "links"), ("B", "C", "links")])
 
         result = engine.pagerank(top_n=3)
         # Check for errors first to aid debugging
@@ -187,36 +167,42 @@ class TestAnalysisTools:
 
     def test_connected_components(self):
         """Test connected components detection."""
-        engine = GraphEngine()
         # Two disconnected components
-        engine.add_nodes([{"label": "A"}, {"label": "B"}, {"label": "C"}, {"label": "D"}])
-        engine.add_edge("A", "B", "connects")
-        engine.add_edge("C", "D", "connects")
-        
+        engine = build_graph(["A", "B", "C", "D"], [("A", "B", "connects"), ("C", "D", "connects")])
+
         result = engine.connected_components()
         assert result["count"] == 2
         assert ["A", "B"] in result["components"]
         assert ["C", "D"] in result["components"]
 
+    def test_connected_components_with_isolates(self):
+        """Test that isolated and self-loop-only nodes are singleton components."""
+        engine = build_graph(["Z", "A", "B", "C", "Loop", "Y"], [
+            ("A", "B", "connects"),
+            ("B", "C", "connects"),
+            ("Loop", "Loop", "self_reference"),
+        ])
+
+        result = engine.connected_components()
+        assert result["count"] == 4
+        assert result["components"] == [["A", "B", "C"], ["Loop"], ["Y"], ["Z"]]
+
     def test_find_cycles(self):
         """Test cycle detection."""
-        engine = GraphEngine()
-        engine.add_nodes([{"label": "A"}, {"label": "B"}, {"label": "C"}])
-        engine.add_edge("A", "B", "next")
-        engine.add_edge("B", "C", "next")
-        engine.add_edge("C", "A", "back")  # Creates cycle
-        
+        engine = build_graph(["A", "B", "C"], [
+            ("A", "B", "next"),
+            ("B", "C", "next"),
+            ("C", "A", "back"),  # Creates cycle
+        ])
+
         result = engine.find_cycles()
         assert result["has_cycles"] is True
         assert len(result["cycles"]) > 0
 
     def test_degree_centrality(self):
         """Test degree centrality calculation."""
-        engine = GraphEngine()
-        engine.add_nodes([{"label": "Hub"}, {"label": "A"}, {"label": "B"}])
-        engine.add_edge("Hub", "A", "connects")
-        engine.add_edge("Hub", "B", "connects")
-        
+        engine = build_graph(["Hub", "A", "B"], [("Hub", "A", "connects"), ("Hub", "B", "connects")])
+
         result = engine.degree_centrality(top_n=1)
         assert len(result["rankings"]) == 1
         # Hub should have highest out-degree
@@ -224,12 +210,12 @@ class TestAnalysisTools:
 
     def test_subgraph_extraction(self):
         """Test subgraph extraction."""
-        engine = GraphEngine()
-        engine.add_nodes([{"label": "A"}, {"label": "B"}, {"label": "C"}, {"label": "D"}])
-        engine.add_edge("A", "B", "connects")
-        engine.add_edge("B", "C", "connects")
-        engine.add_edge("C", "D", "connects")
-        
+        engine = build_graph(["A", "B", "C", "D"], [
+            ("A", "B", "connects"),
+            ("B", "C", "connects"),
+            ("C", "D", "connects"),
+        ])
+
         result = engine.subgraph(["A", "B", "C"])
         assert len(result["nodes"]) == 3
         assert len(result["edges"]) == 2  # A->B, B->C
@@ -283,6 +269,15 @@ class TestSessionManager:
         names = [g["name"] for g in graphs]
         assert "temp" not in names
 
+    def test_clear(self):
+        """Test deleting all graphs at once."""
+        manager = SessionManager()
+        manager.get_graph("test1")
+        manager.get_graph("test2")
+
+        manager.clear()
+        assert manager.list_graphs() == []
+
     def test_get_graph_info_nonexistent(self):
         """Test that getting info for nonexistent graph gives helpful error."""
         manager = SessionManager()
@@ -306,10 +301,8 @@ class TestErrorMessages:
 
     def test_add_edge_node_not_found_suggests_alternatives(self):
         """Test that node not found error lists available nodes."""
-        engine = GraphEngine()
-        engine.add_node("Available1")
-        engine.add_node("Available2")
-        
+        engine = build_graph(["Available1", "Available2"])
+
         try:
             engine.add_edge("Available1", "Missing", "connects")
         except ValueError as e:
@@ -319,10 +312,8 @@ class TestErrorMessages:
 
     def test_shortest_path_suggests_connected_components(self):
         """Test that no path error suggests using connected_components."""
-        engine = GraphEngine()
-        engine.add_node("A")
-        engine.add_node("B")
-        
+        engine = build_graph(["A", "B"])
+
         result = engine.shortest_path("A", "B")
         assert "connected_components" in result.get("reason", "").lower()
 
@@ -504,3 +504,86 @@ class TestPreprocessCypherFunction:
         assert "WHERE r.relation" in fixed_query
         assert "AND" in fixed_query
         assert len(fixes) == 2  # quotes + edge type
+
+
+class TestCypherResultCache:
+    """Tests for caching query results by graph version."""
+
+    def test_repeated_query_returns_same_result(self, monkeypatch):
+        """Test that a repeated query is served from the cache until the version changes."""
+        from src.mcp_graph_engine import cypher
+
+        calls = []
+        run_cypher_query = cypher._run_cypher_query
+
+        def counting_run(nx_graph, query):
+            calls.append(query)
+            return run_cypher_query(nx_graph, query)
+
+        monkeypatch.setattr(cypher, "_run_cypher_query", counting_run)
+
+        engine = GraphEngine()
+        engine.add_node("Frodo", node_type="character")
+        engine.add_node("Sam", node_type="character")
+
+        query = 'MATCH (c) WHERE c.type = "character" RETURN c.label'
+        first = execute_cypher_query(engine.graph, query, version=engine.version)
+        second = execute_cypher_query(engine.graph, query, version=engine.version)
+
+        assert first == second
+        assert second["count"] == 2
+        assert len(calls) == 1
+
+        engine.add_node("Pippin", node_type="character")
+        third = execute_cypher_query(engine.graph, query, version=engine.version)
+
+        assert third["count"] == 3
+        assert len(calls) == 2
+
+    def test_equal_versions_of_different_graphs_are_cached_apart(self):
+        """Test that two graphs at the same version don't share cached results."""
+        frodo = GraphEngine()
+        frodo.add_node("Frodo", node_type="character")
+        sam = GraphEngine()
+        sam.add_node("Sam", node_type="character")
+
+        # Same version, as when the engine is imported under two module names
+        query = 'MATCH (c) RETURN c.label'
+        first = execute_cypher_query(frodo.graph, query, version=1, graph_id=id(frodo.graph))
+        second = execute_cypher_query(sam.graph, query, version=1, graph_id=id(sam.graph))
+
+        assert first["rows"] == [{"c.label": "Frodo"}]
+        assert second["rows"] == [{"c.label": "Sam"}]
+
+    def test_mutation_invalidates_cached_result(self):
+        """Test that mutating the graph changes its version and the result."""
+        engine = GraphEngine()
+        engine.add_node("Frodo", node_type="character")
+
+        query = 'MATCH (c) WHERE c.type = "character" RETURN c.label'
+        before = execute_cypher_query(engine.graph, query, version=engine.version)
+        version = engine.version
+
+        engine.add_node("Sam", node_type="character")
+        assert engine.version != version
+
+        after = execute_cypher_query(engine.graph, query, version=engine.version)
+        assert before["count"] == 1
+        assert after["count"] == 2
+
+    def test_cached_result_is_copied(self):
+        """Test that callers can mutate a result without affecting the cache."""
+        engine = GraphEngine()
+        engine.add_node("Frodo", node_type="character")
+
+        query = 'MATCH (c) RETURN c.label'
+        result = execute_cypher_query(engine.graph, query, version=engine.version)
+        result["rows"].clear()
+
+        again = execute_cypher_query(engine.graph, query, version=engine.version)
+        assert again["count"] == 1
+        assert again["rows"][0]["c.label"] == "Frodo"
+
+    def test_engines_have_distinct_versions(self):
+        """Test that two fresh engines never share a version."""
+        assert GraphEngine().version != GraphEngine().version
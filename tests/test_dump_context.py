@@ -1,8 +1,15 @@
 """Tests for the dump_context tool."""
 
 import pytest
-from mcp_graph_engine.graph_engine import GraphEngine
-from mcp_graph_engine.server import GraphServer
+from src.mcp_graph_engine.graph_engine import GraphEngine
+from src.mcp_graph_engine.server import GraphServer
+from tests.helpers import assert_contains_all, build_graph
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Create one server shared by all tests in this module."""
+    return GraphServer()
 
 
 @pytest.fixture
@@ -11,238 +18,188 @@ def empty_graph():
     return GraphEngine()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def simple_graph():
     """Create a simple graph with a few nodes and edges."""
-    graph = GraphEngine()
-
-    # Add nodes with types
-    graph.add_node("ServiceA", node_type="service")
-    graph.add_node("ServiceB", node_type="service")
-    graph.add_node("DatabasePool", node_type="infrastructure")
-
-    # Add edges
-    graph.add_edge("ServiceA", "DatabasePool", "depends_on")
-    graph.add_edge("ServiceB", "DatabasePool", "depends_on")
-
-    return graph
-
-
-@pytest.fixture
+    return build_graph(
+        [
+            ("ServiceA", "service"),
+            ("ServiceB", "service"),
+            ("DatabasePool", "infrastructure"),
+        ],
+        [
+            ("ServiceA", "DatabasePool", "depends_on"),
+            ("ServiceB", "DatabasePool", "depends_on"),
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
 def complex_graph():
     """Create a complex graph with multiple node types, cycles, and orphans."""
-    graph = GraphEngine()
-
-    # Services
-    graph.add_node("AuthService", node_type="service")
-    graph.add_node("UserService", node_type="service")
-    graph.add_node("PaymentService", node_type="service")
-    graph.add_node("LoginService", node_type="service")
-
-    # Repositories
-    graph.add_node("UserRepository", node_type="repository")
-    graph.add_node("PaymentRepository", node_type="repository")
-    graph.add_node("SessionRepository", node_type="repository")
-
-    # Infrastructure
-    graph.add_node("DatabasePool", node_type="infrastructure")
-    graph.add_node("CacheLayer", node_type="infrastructure")
-    graph.add_node("MessageQueue", node_type="infrastructure")
-
-    # Orphan node
-    graph.add_node("UnusedService", node_type="service")
-
-    # Add edges to create a complex structure
-    graph.add_edge("AuthService", "UserRepository", "depends_on")
-    graph.add_edge("AuthService", "SessionRepository", "depends_on")
-    graph.add_edge("LoginService", "AuthService", "uses")
-    graph.add_edge("UserService", "UserRepository", "depends_on")
-    graph.add_edge("UserService", "CacheLayer", "depends_on")
-    graph.add_edge("PaymentService", "PaymentRepository", "depends_on")
-    graph.add_edge("UserRepository", "DatabasePool", "depends_on")
-    graph.add_edge("PaymentRepository", "DatabasePool", "depends_on")
-    graph.add_edge("SessionRepository", "DatabasePool", "depends_on")
-    graph.add_edge("SessionRepository", "CacheLayer", "depends_on")
-    graph.add_edge("CacheLayer", "MessageQueue", "depends_on")
-
-    # Create a cycle: AuthService -> UserService -> AuthService
-    graph.add_edge("AuthService", "UserService", "notifies")
-    graph.add_edge("UserService", "AuthService", "uses")
-
-    return graph
+    return build_graph(
+        [
+            # Services
+            ("AuthService", "service"),
+            ("UserService", "service"),
+            ("PaymentService", "service"),
+            ("LoginService", "service"),
+            # Repositories
+            ("UserRepository", "repository"),
+            ("PaymentRepository", "repository"),
+            ("SessionRepository", "repository"),
+            # Infrastructure
+            ("DatabasePool", "infrastructure"),
+            ("CacheLayer", "infrastructure"),
+            ("MessageQueue", "infrastructure"),
+            # Orphan node
+            ("UnusedService", "service"),
+        ],
+        [
+            # A complex dependency structure
+            ("AuthService", "UserRepository", "depends_on"),
+            ("AuthService", "SessionRepository", "depends_on"),
+            ("LoginService", "AuthService", "uses"),
+            ("UserService", "UserRepository", "depends_on"),
+            ("UserService", "CacheLayer", "depends_on"),
+            ("PaymentService", "PaymentRepository", "depends_on"),
+            ("UserRepository", "DatabasePool", "depends_on"),
+            ("PaymentRepository", "DatabasePool", "depends_on"),
+            ("SessionRepository", "DatabasePool", "depends_on"),
+            ("SessionRepository", "CacheLayer", "depends_on"),
+            ("CacheLayer", "MessageQueue", "depends_on"),
+            # A cycle: AuthService -> UserService -> AuthService
+            ("AuthService", "UserService", "notifies"),
+            ("UserService", "AuthService", "uses"),
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
+def simple_context(server, simple_graph):
+    """Dump the simple graph once for all tests that only read the context."""
+    return server._dump_context(simple_graph, "default")["context"]
+
+
+@pytest.fixture(scope="module")
+def complex_context(server, complex_graph):
+    """Dump the complex graph once for all tests that only read the context."""
+    return server._dump_context(complex_graph, "default")["context"]
 
 
 class TestDumpContextEmpty:
     """Test dump_context with empty graph."""
 
-    def test_empty_graph(self, empty_graph):
+    def test_empty_graph(self, empty_graph, server):
         """Test dump_context on an empty graph."""
-        server = GraphServer()
         result = server._dump_context(empty_graph, "default")
 
         assert "context" in result
-        context = result["context"]
-
-        # Should have header
-        assert "=== Graph Context: default ===" in context
-
-        # Should have statistics
-        assert "## Statistics" in context
-        assert "0 nodes, 0 edges" in context
-
-        # Should indicate empty
-        assert "(Graph is empty)" in context
+        assert_contains_all(result["context"], [
+            # Should have header
+            "=== Graph Context: default ===",
+            # Should have statistics
+            "## Statistics",
+            "0 nodes, 0 edges",
+            # Should indicate empty
+            "(Graph is empty)",
+        ])
 
 
 class TestDumpContextSimple:
     """Test dump_context with simple graph."""
 
-    def test_simple_graph_structure(self, simple_graph):
+    def test_simple_graph_structure(self, simple_context):
         """Test that all major sections are present."""
-        server = GraphServer()
-        result = server._dump_context(simple_graph, "default")
-
-        context = result["context"]
-
-        # Check all major sections exist
-        assert "=== Graph Context: default ===" in context
-        assert "## Statistics" in context
-        assert "## Nodes by Type" in context
-        assert "## Relationships" in context
-        assert "## Key Insights" in context
-
-    def test_simple_graph_statistics(self, simple_graph):
+        assert_contains_all(simple_context, [
+            "=== Graph Context: default ===",
+            "## Statistics",
+            "## Nodes by Type",
+            "## Relationships",
+            "## Key Insights",
+        ])
+
+    def test_simple_graph_statistics(self, simple_context):
         """Test statistics section."""
-        server = GraphServer()
-        result = server._dump_context(simple_graph, "default")
-
-        context = result["context"]
-
-        # Check statistics
-        assert "3 nodes, 2 edges" in context
-        assert "2 node types" in context
-        assert "infrastructure" in context
-        assert "service" in context
-        assert "Cycles detected: No" in context
-
-    def test_simple_graph_nodes_by_type(self, simple_graph):
+        assert_contains_all(simple_context, [
+            "3 nodes, 2 edges",
+            "2 node types",
+            "infrastructure",
+            "service",
+            "Cycles detected: No",
+        ])
+
+    def test_simple_graph_nodes_by_type(self, simple_context):
         """Test nodes grouped by type."""
-        server = GraphServer()
-        result = server._dump_context(simple_graph, "default")
-
-        context = result["context"]
-
-        # Should have node type sections
-        assert "### infrastructure (1 nodes)" in context
-        assert "- DatabasePool" in context
-        assert "### service (2 nodes)" in context
-        assert "- ServiceA" in context
-        assert "- ServiceB" in context
-
-    def test_simple_graph_relationships(self, simple_graph):
+        assert_contains_all(simple_context, [
+            "### infrastructure (1 nodes)",
+            "- DatabasePool",
+            "### service (2 nodes)",
+            "- ServiceA",
+            "- ServiceB",
+        ])
+
+    def test_simple_graph_relationships(self, simple_context):
         """Test relationships listing."""
-        server = GraphServer()
-        result = server._dump_context(simple_graph, "default")
-
-        context = result["context"]
-
-        # Should list relationships
-        assert "## Relationships (2 total)" in context
-        assert "ServiceA depends_on DatabasePool" in context
-        assert "ServiceB depends_on DatabasePool" in context
+        assert_contains_all(simple_context, [
+            "## Relationships (2 total)",
+            "ServiceA depends_on DatabasePool",
+            "ServiceB depends_on DatabasePool",
+        ])
 
-    def test_simple_graph_insights(self, simple_graph):
+    def test_simple_graph_insights(self, simple_context):
         """Test key insights section."""
-        server = GraphServer()
-        result = server._dump_context(simple_graph, "default")
-
-        context = result["context"]
-
         # DatabasePool should be most connected (2 incoming edges)
-        assert "- Most connected: DatabasePool" in context
-        assert "- Isolated nodes: None" in context
+        assert_contains_all(simple_context, [
+            "- Most connected: DatabasePool",
+            "- Isolated nodes: None",
+        ])
 
 
 class TestDumpContextComplex:
     """Test dump_context with complex graph."""
 
-    def test_complex_graph_statistics(self, complex_graph):
+    def test_complex_graph_statistics(self, complex_context):
         """Test statistics with more complex graph."""
-        server = GraphServer()
-        result = server._dump_context(complex_graph, "default")
-
-        context = result["context"]
-
-        # Check node and edge counts
-        assert "11 nodes, 13 edges" in context  # 11 nodes, 13 edges
-
-        # Check node types
-        assert "3 node types" in context
-        assert "infrastructure" in context
-        assert "repository" in context
-        assert "service" in context
-
-        # Should detect cycle
-        assert "Cycles detected: Yes" in context
-
-    def test_complex_graph_all_types_present(self, complex_graph):
+        assert_contains_all(complex_context, [
+            "11 nodes, 13 edges",
+            "3 node types",
+            "infrastructure",
+            "repository",
+            "service",
+            # Should detect cycle
+            "Cycles detected: Yes",
+        ])
+
+    def test_complex_graph_all_types_present(self, complex_context):
         """Test that all node types are listed."""
-        server = GraphServer()
-        result = server._dump_context(complex_graph, "default")
+        assert_contains_all(complex_context, [
+            "### infrastructure (3 nodes)",
+            "### repository (3 nodes)",
+            "### service (5 nodes)",
+        ])
 
-        context = result["context"]
-
-        # Check that sections for all types exist
-        assert "### infrastructure (3 nodes)" in context
-        assert "### repository (3 nodes)" in context
-        assert "### service (5 nodes)" in context
-
-    def test_complex_graph_hubs_detected(self, complex_graph):
+    def test_complex_graph_hubs_detected(self, complex_context):
         """Test that hub nodes are identified."""
-        server = GraphServer()
-        result = server._dump_context(complex_graph, "default")
-
-        context = result["context"]
-
         # DatabasePool should be most connected (3 incoming edges)
-        assert "Most connected:" in context
-
-        # Should have hubs section
-        assert "- Hubs:" in context
+        assert_contains_all(complex_context, ["Most connected:", "- Hubs:"])
 
-    def test_complex_graph_orphans_detected(self, complex_graph):
+    def test_complex_graph_orphans_detected(self, complex_context):
         """Test that isolated nodes are identified."""
-        server = GraphServer()
-        result = server._dump_context(complex_graph, "default")
-
-        context = result["context"]
-
         # UnusedService has no connections
-        assert "UnusedService" in context
-        # Note: It will be listed in nodes, and in isolated nodes
-        assert "- Isolated nodes:" in context
-        assert "UnusedService" in context
+        assert "- Isolated nodes: UnusedService" in complex_context
 
-    def test_complex_graph_cycles_listed(self, complex_graph):
+    def test_complex_graph_cycles_listed(self, complex_context):
         """Test that cycles are listed in insights."""
-        server = GraphServer()
-        result = server._dump_context(complex_graph, "default")
-
-        context = result["context"]
-
-        # Should list cycles
-        assert "- Cycles:" in context
         # The cycle should include AuthService and UserService
-        assert "AuthService" in context
-        assert "UserService" in context
+        assert_contains_all(complex_context, ["- Cycles:", "AuthService", "UserService"])
 
 
 class TestDumpContextMultiGraph:
     """Test dump_context with multiple graphs."""
 
-    def test_graph_name_in_header(self):
+    def test_graph_name_in_header(self, server):
         """Test that graph name appears in the output."""
-        server = GraphServer()
         graph = GraphEngine()
 
         result = server._dump_context(graph, "my-custom-graph")
@@ -254,14 +211,13 @@ class TestDumpContextMultiGraph:
 class TestDumpContextEdgeCases:
     """Test edge cases."""
 
-    def test_graph_with_only_orphans(self):
+    def test_graph_with_only_orphans(self, server):
         """Test graph with nodes but no edges."""
         graph = GraphEngine()
         graph.add_node("Node1", node_type="type1")
         graph.add_node("Node2", node_type="type2")
         graph.add_node("Node3", node_type="type1")
 
-        server = GraphServer()
         result = server._dump_context(graph, "default")
         context = result["context"]
 
@@ -274,46 +230,40 @@ class TestDumpContextEdgeCases:
         # All nodes should be orphans
         assert "- Isolated nodes: Node1, Node2, Node3" in context
 
-    def test_graph_with_many_cycles(self):
+    def test_graph_with_many_cycles(self, server):
         """Test graph with multiple cycles."""
-        graph = GraphEngine()
+        # Create multiple small cycles: A <-> B, C <-> D, E <-> F, G <-> H
+        pairs = [("A", "B"), ("C", "D"), ("E", "F"), ("G", "H")]
+        graph = build_graph(
+            [label for pair in pairs for label in pair],
+            [edge for a, b in pairs for edge in ((a, b, "rel"), (b, a, "rel"))]
+        )
+
+        result = server._dump_context(graph, "default")
+        context = result["context"]
+
+        # Should detect cycles
+        assert "Cycles detected: Yes" in context
+
+        # Should show up to 3 cycles and note that there are more
+        assert "- Cycles:" in context
+        assert "  - ... and more" in context
 
-        # Create multiple small cycles
-        # Cycle 1: A -> B -> A
+    def test_self_loop_listed_as_cycle(self, server):
+        """Test that a self-loop is reported even though its SCC is a single node."""
+        graph = GraphEngine()
         graph.add_node("A")
         graph.add_node("B")
         graph.add_edge("A", "B", "rel")
-        graph.add_edge("B", "A", "rel")
+        graph.add_edge("B", "B", "retries")
 
-        # Cycle 2: C -> D -> C
-        graph.add_node("C")
-        graph.add_node("D")
-        graph.add_edge("C", "D", "rel")
-        graph.add_edge("D", "C", "rel")
-
-        # Cycle 3: E -> F -> E
-        graph.add_node("E")
-        graph.add_node("F")
-        graph.add_edge("E", "F", "rel")
-        graph.add_edge("F", "E", "rel")
-
-        # Cycle 4: G -> H -> G
-        graph.add_node("G")
-        graph.add_node("H")
-        graph.add_edge("G", "H", "rel")
-        graph.add_edge("H", "G", "rel")
-
-        server = GraphServer()
         result = server._dump_context(graph, "default")
         context = result["context"]
 
-        # Should detect cycles
         assert "Cycles detected: Yes" in context
+        assert "  - B -> B" in context
 
-        # Should show up to 3 cycles
-        assert "- Cycles:" in context
-
-    def test_graph_with_unknown_type_nodes(self):
+    def test_graph_with_unknown_type_nodes(self, server):
         """Test graph with nodes that have no type."""
         graph = GraphEngine()
 
@@ -325,7 +275,6 @@ class TestDumpContextEdgeCases:
         graph.add_node("UntypedNode1")
         graph.add_node("UntypedNode2")
 
-        server = GraphServer()
         result = server._dump_context(graph, "default")
         context = result["context"]
 
@@ -337,7 +286,7 @@ class TestDumpContextEdgeCases:
         assert "- UntypedNode1" in context
         assert "- UntypedNode2" in context
 
-    def test_relationships_are_sorted(self):
+    def test_relationships_are_sorted(self, server):
         """Test that relationships are listed in consistent order."""
         graph = GraphEngine()
 
@@ -350,29 +299,68 @@ class TestDumpContextEdgeCases:
         graph.add_edge("A", "M", "rel2")
         graph.add_edge("M", "Z", "rel3")
 
-        server = GraphServer()
         result = server._dump_context(graph, "default")
         context = result["context"]
 
-        # Find the relationships section
-        lines = context.split('\n')
-        rel_start = None
-        for i, line in enumerate(lines):
-            if "## Relationships" in line:
-                rel_start = i
-                break
-
-        assert rel_start is not None
-
-        # Get relationship lines (skip header and blank line)
-        rel_lines = []
-        for line in lines[rel_start+2:]:
-            if line.startswith("- "):
-                rel_lines.append(line)
-            elif line.startswith("##"):
-                break
+        # Slice out the relationships section (header, blank line, then entries)
+        start = context.index("## Relationships")
+        body_start = context.index("\n\n", start) + 2
+        body_end = context.find("\n##", body_start)
+        rel_lines = [
+            line for line in context[body_start:body_end].splitlines()
+            if line.startswith("- ")
+        ]
 
         # Should be in alphabetical order by source
         assert rel_lines[0] == "- A rel2 M"
         assert rel_lines[1] == "- M rel3 Z"
         assert rel_lines[2] == "- Z rel1 A"
+
+
+class TestDumpContextCaching:
+    """Test that cycle detection is memoized on the graph version."""
+
+    def test_cycles_reused_until_graph_changes(self, server, monkeypatch):
+        """Test that repeated dumps reuse the cycle sample and mutations invalidate it."""
+        graph = GraphEngine()
+        graph.add_node("A")
+        graph.add_node("B")
+        graph.add_edge("A", "B", "rel")
+        graph.add_edge("B", "A", "rel")
+
+        calls = []
+        sample_cycles = server._sample_cycles
+
+        def counting_sample_cycles(nx_graph, limit):
+            calls.append(limit)
+            return sample_cycles(nx_graph, limit)
+
+        monkeypatch.setattr(server, "_sample_cycles", counting_sample_cycles)
+
+        first = server._dump_context(graph, "default")["context"]
+        second = server._dump_context(graph, "default")["context"]
+        assert first == second
+        assert len(calls) == 1
+
+        graph.add_edge("B", "B", "retries")
+        context = server._dump_context(graph, "default")["context"]
+        assert len(calls) == 2
+        assert "  - B -> B" in context
+
+    def test_cycles_cached_per_graph(self, server):
+        """Test that two graphs at the same version don't share a cycle sample."""
+        cyclic = build_graph(
+            [("A", "service"), ("B", "service")],
+            [("A", "B", "calls"), ("B", "A", "calls")]
+        )
+        acyclic = build_graph(
+            [("C", "service"), ("D", "service")],
+            [("C", "D", "calls")]
+        )
+        # Same version, as when the engine is imported under two module names
+        acyclic._version = cyclic.version
+
+        assert "Cycles detected: Yes" in server._dump_context(cyclic, "cyclic")["context"]
+        context = server._dump_context(acyclic, "acyclic")["context"]
+        assert "Cycles detected: No" in context
+        assert "A -> B" not in context
@@ -1,13 +1,45 @@
 """Integration tests for dump_context tool through the server."""
 
+import asyncio
+
 import pytest
 from mcp_graph_engine.server import GraphServer
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def server():
-    """Create a server instance for testing."""
-    return GraphServer()
+    """Create one server for the session, seeding its test graphs concurrently.
+
+    Tests that need a graph of their own name it after the test (see
+    graph_name) so they stay isolated on the shared server.
+    """
+    server = GraphServer()
+
+    async def seed():
+        await asyncio.gather(
+            server._handle_tool("add_facts", {
+                "graph": "test",
+                "facts": [
+                    {"from": "ServiceA", "to": "ServiceB", "rel": "depends_on"},
+                    {"from": "ServiceB", "to": "DatabasePool", "rel": "depends_on"},
+                ]
+            }),
+            # No graph name: seeds the default graph
+            server._handle_tool("add_facts", {
+                "facts": [
+                    {"from": "A", "to": "B", "rel": "relates_to"},
+                ]
+            }),
+        )
+
+    asyncio.run(seed())
+    return server
+
+
+@pytest.fixture
+def graph_name(request):
+    """Graph name unique to the requesting test."""
+    return f"test-{request.node.name}"
 
 
 class TestDumpContextIntegration:
@@ -22,16 +54,7 @@ class TestDumpContextIntegration:
     @pytest.mark.asyncio
     async def test_dump_context_through_server(self, server):
         """Test calling dump_context through the server."""
-        # First add some facts
-        await server._handle_tool("add_facts", {
-            "graph": "test",
-            "facts": [
-                {"from": "ServiceA", "to": "ServiceB", "rel": "depends_on"},
-                {"from": "ServiceB", "to": "DatabasePool", "rel": "depends_on"},
-            ]
-        })
-
-        # Now dump context
+        # The "test" graph is seeded by the server fixture
         result = await server._handle_tool("dump_context", {"graph": "test"})
 
         # Check result structure
@@ -47,9 +70,9 @@ class TestDumpContextIntegration:
         assert "## Key Insights" in context
 
     @pytest.mark.asyncio
-    async def test_dump_context_empty_graph(self, server):
+    async def test_dump_context_empty_graph(self, server, graph_name):
         """Test dump_context on empty graph."""
-        result = await server._handle_tool("dump_context", {"graph": "empty-test"})
+        result = await server._handle_tool("dump_context", {"graph": graph_name})
 
         assert "context" in result
         context = result["context"]
@@ -59,13 +82,7 @@ class TestDumpContextIntegration:
     @pytest.mark.asyncio
     async def test_dump_context_default_graph(self, server):
         """Test that dump_context defaults to 'default' graph."""
-        # Add to default graph
-        await server._handle_tool("add_facts", {
-            "facts": [
-                {"from": "A", "to": "B", "rel": "relates_to"},
-            ]
-        })
-
+        # The default graph is seeded by the server fixture
         # Dump without specifying graph
         result = await server._handle_tool("dump_context", {})
 
@@ -1,7 +1,73 @@
 """Tests for graph import/export functionality."""
 
+import json
+import math
+
 import pytest
 from src.mcp_graph_engine.graph_engine import GraphEngine
+from src.mcp_graph_engine.server import GraphServer
+from tests.helpers import build_graph, dump_json, line_set, load_json
+
+# Minimal import documents shared across tests, as bytes ready for file
+# writes: a lone node "A" for JSON, a single A -> B edge for the other formats
+_JSON_BASIC = b'{"nodes": [{"label": "A"}], "edges": []}'
+_CSV_BASIC = b"source,target,relation\nA,B,calls\n"
+_DOT_BASIC = b"digraph test { A -> B; }"
+_GRAPHML_BASIC = b"""<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <graph edgedefault="directed">
+    <node id="A"/>
+    <node id="B"/>
+    <edge source="A" target="B"/>
+  </graph>
+</graphml>"""
+
+
+@pytest.fixture(scope="module")
+def large_source_engine():
+    """Build the 20-node roundtrip source graph once for all formats."""
+    # A chain of nodes plus some cross-edges
+    return build_graph(
+        [(f"Node{i}", "class") for i in range(20)],
+        [(f"Node{i}", f"Node{i+1}", "connects") for i in range(19)]
+        + [("Node0", "Node10", "shortcut"), ("Node5", "Node15", "shortcut")]
+    )
+
+
+@pytest.fixture(scope="module")
+def auth_engine():
+    """Build the typed AuthController -> AuthService -> UserRepository chain once.
+
+    Shared as-is, so tests must only read or export it.
+    """
+    return build_graph(
+        [
+            ("AuthController", "controller"),
+            ("AuthService", "service"),
+            ("UserRepository", "repository"),
+        ],
+        [
+            ("AuthController", "AuthService", "calls"),
+            ("AuthService", "UserRepository", "uses"),
+        ]
+    )
+
+
+@pytest.fixture(scope="module")
+def empty_engine():
+    """Create one empty engine shared by export-only tests."""
+    return GraphEngine()
+
+
+@pytest.fixture(scope="module")
+def links_server():
+    """Create one server whose default graph is X -links-> Y, for export-only tests."""
+    server = GraphServer()
+    graph = server.session_manager.get_graph("default")
+    graph.add_node("X")
+    graph.add_node("Y")
+    graph.add_edge("X", "Y", "links")
+    return server
 
 
 class TestDOTFormat:
@@ -58,14 +124,9 @@ class TestDOTFormat:
         assert engine.graph.nodes["A"]["type"] == "controller"
         assert engine.graph.nodes["B"]["type"] == "service"
 
-    def test_roundtrip_dot(self):
+    def test_roundtrip_dot(self, auth_engine):
         """Test export then import produces equivalent graph."""
-        engine1 = GraphEngine()
-        engine1.add_node("AuthController", node_type="controller")
-        engine1.add_node("AuthService", node_type="service")
-        engine1.add_node("UserRepository", node_type="repository")
-        engine1.add_edge("AuthController", "AuthService", "calls")
-        engine1.add_edge("AuthService", "UserRepository", "uses")
+        engine1 = auth_engine
 
         # Export
         dot_content = engine1.export_graph("dot")
@@ -80,6 +141,21 @@ class TestDOTFormat:
         assert engine1.graph.number_of_nodes() == engine2.graph.number_of_nodes()
         assert engine1.graph.number_of_edges() == engine2.graph.number_of_edges()
 
+    def test_roundtrip_dot_quoted_labels(self):
+        """Test that labels and relations with spaces survive a DOT roundtrip."""
+        engine1 = GraphEngine()
+        engine1.add_node("Auth Controller", node_type="web controller")
+        engine1.add_node("digraph")
+        engine1.add_edge("Auth Controller", "digraph", "depends on")
+
+        dot_content = engine1.export_graph("dot")
+
+        engine2 = GraphEngine()
+        engine2.import_graph("dot", dot_content)
+
+        assert engine2.graph.nodes["Auth Controller"]["type"] == "web controller"
+        assert engine2.graph.get_edge_data("Auth Controller", "digraph")["relation"] == "depends on"
+
 
 class TestCSVFormat:
     """Tests for CSV format import/export."""
@@ -128,6 +204,30 @@ B,C"""
         edge_data = engine.graph.get_edge_data("A", "B")
         assert edge_data["relation"] == "edge"
 
+    def test_import_csv_quoted_fields(self):
+        """Test CSV import with quoted fields containing commas."""
+        engine = GraphEngine()
+
+        csv_content = """source,target,relation
+"Auth, Inc",UserRepository,"depends_on"
+UserRepository,Database,queries"""
+
+        result = engine.import_graph("csv", csv_content)
+
+        assert result["nodes_added"] == 3
+        assert engine.graph.get_edge_data("Auth, Inc", "UserRepository")["relation"] == "depends_on"
+
+    def test_export_csv_quotes_special_characters(self):
+        """Test that CSV export quotes labels containing commas or quotes."""
+        engine = GraphEngine()
+        engine.add_node("Auth, Inc")
+        engine.add_node('The "Repo"')
+        engine.add_edge("Auth, Inc", 'The "Repo"', "uses")
+
+        csv_content = engine.export_graph("csv")
+
+        assert '"Auth, Inc","The ""Repo""",uses' in csv_content
+
     def test_roundtrip_csv(self):
         """Test export then import produces equivalent graph."""
         engine1 = GraphEngine()
@@ -166,6 +266,55 @@ class TestJSONFormat:
         assert '"type": "class"' in json_content
         assert '"relation": "calls"' in json_content
 
+    @pytest.mark.parametrize("label,properties", [
+        pytest.param("A", {"weight": 1.5}, id="ascii"),
+        pytest.param("über", {"name": "naïve"}, id="non_ascii"),
+        pytest.param("A", {"n": float("nan"), "inf": float("inf")}, id="non_finite_floats"),
+        pytest.param("A", {"tiny": 1e-7, "huge": 1e20}, id="exponent_floats"),
+        pytest.param("A", {"big": 2**70}, id="int_beyond_64_bits"),
+    ])
+    def test_export_json_matches_without_orjson(self, monkeypatch, label, properties):
+        """Test that JSON export is identical with and without orjson."""
+        from src.mcp_graph_engine import graph_engine
+
+        engine = GraphEngine()
+        engine.add_node(label, node_type="class", properties=properties)
+        engine.add_node("B")
+        engine.add_edge(label, "B", "calls", properties={"line": 10})
+
+        json_content = engine.export_graph("json")
+        monkeypatch.setattr(graph_engine, "ORJSON_AVAILABLE", False)
+
+        assert engine.export_graph("json") == json_content
+
+    def test_json_roundtrip_keeps_special_values(self):
+        """Test that NaN, Infinity, big ints and non-ASCII labels survive a roundtrip."""
+        engine1 = GraphEngine()
+        engine1.add_node("über", properties={"n": float("nan"), "inf": float("-inf"), "big": 2**70})
+
+        engine2 = GraphEngine()
+        engine2.import_graph("json", engine1.export_graph("json"))
+
+        attrs = engine2.graph.nodes["über"]
+        assert math.isnan(attrs["n"])
+        assert attrs["inf"] == float("-inf")
+        assert attrs["big"] == 2**70
+
+    def test_import_json_written_by_stdlib(self):
+        """Test that JSON with NaN/Infinity tokens from json.dumps imports."""
+        content = json.dumps({
+            "nodes": [{"label": "A", "properties": {"n": float("nan"), "inf": float("inf")}}],
+            "edges": []
+        })
+        assert "NaN" in content
+
+        engine = GraphEngine()
+        result = engine.import_graph("json", content)
+
+        assert result["nodes_added"] == 1
+        assert math.isnan(engine.graph.nodes["A"]["n"])
+        assert engine.graph.nodes["A"]["inf"] == float("inf")
+
     def test_import_json_basic(self):
         """Test basic JSON import."""
         engine = GraphEngine()
@@ -204,7 +353,7 @@ class TestJSONFormat:
 
         assert result["nodes_added"] == 2
         assert engine.graph.nodes["A"]["file"] == "a.py"
-        assert engine.graph.edges["A", "B"]["line"] == 5
+        assert engine.graph.get_edge_data("A", "B")["line"] == 5
 
     def test_roundtrip_json(self):
         """Test export then import produces equivalent graph."""
@@ -225,7 +374,7 @@ class TestJSONFormat:
         assert result["edges_added"] == 1
         assert engine2.graph.nodes["A"]["type"] == "class"
         assert engine2.graph.nodes["A"]["file"] == "a.py"
-        assert engine2.graph.edges["A", "B"]["line"] == 10
+        assert engine2.graph.get_edge_data("A", "B")["line"] == 10
 
 
 class TestGraphMLFormat:
@@ -249,17 +398,7 @@ class TestGraphMLFormat:
         """Test basic GraphML import."""
         engine = GraphEngine()
 
-        # Create a simple GraphML document
-        graphml_content = """<?xml version="1.0" encoding="UTF-8"?>
-<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
-  <graph edgedefault="directed">
-    <node id="A"/>
-    <node id="B"/>
-    <edge source="A" target="B"/>
-  </graph>
-</graphml>"""
-
-        result = engine.import_graph("graphml", graphml_content)
+        result = engine.import_graph("graphml", _GRAPHML_BASIC.decode("utf-8"))
 
         assert result["nodes_added"] == 2
         assert result["edges_added"] == 1
@@ -317,12 +456,7 @@ New1,New2,calls"""
         """Test that import creates a new graph if it doesn't exist."""
         engine = GraphEngine()
 
-        json_content = """{
-            "nodes": [{"label": "A"}],
-            "edges": []
-        }"""
-
-        result = engine.import_graph("json", json_content)
+        result = engine.import_graph("json", _JSON_BASIC.decode("utf-8"))
 
         assert result["nodes_added"] == 1
         assert "A" in engine.graph
@@ -373,35 +507,21 @@ A,B"""
 class TestComplexScenarios:
     """Tests for complex import/export scenarios."""
 
-    def test_large_graph_roundtrip(self):
+    @pytest.mark.parametrize("format_name", ["json", "csv", "dot", "graphml"])
+    def test_large_graph_roundtrip(self, large_source_engine, format_name):
         """Test roundtrip with a larger graph."""
-        engine1 = GraphEngine()
-
-        # Create a graph with many nodes and edges
-        for i in range(20):
-            engine1.add_node(f"Node{i}", node_type="class")
+        engine1 = large_source_engine
 
-        for i in range(19):
-            engine1.add_edge(f"Node{i}", f"Node{i+1}", "connects")
-
-        # Add some cross-edges
-        engine1.add_edge("Node0", "Node10", "shortcut")
-        engine1.add_edge("Node5", "Node15", "shortcut")
-
-        # Test with each format
-        for format_name in ["json", "csv", "dot", "graphml"]:
-            # Export
-            content = engine1.export_graph(format_name)
+        # Export
+        content = engine1.export_graph(format_name)
 
-            # Import into new graph
-            engine2 = GraphEngine()
-            result = engine2.import_graph(format_name, content)
+        # Import into new graph
+        engine2 = GraphEngine()
+        engine2.import_graph(format_name, content)
 
-            # Verify counts
-            assert engine1.graph.number_of_nodes() == engine2.graph.number_of_nodes(), \
-                f"Node count mismatch for {format_name}"
-            assert engine1.graph.number_of_edges() == engine2.graph.number_of_edges(), \
-                f"Edge count mismatch for {format_name}"
+        # Verify counts
+        assert engine1.graph.number_of_nodes() == engine2.graph.number_of_nodes()
+        assert engine1.graph.number_of_edges() == engine2.graph.number_of_edges()
 
     def test_import_multiple_formats_sequential(self):
         """Test importing multiple formats into same graph."""
@@ -428,19 +548,17 @@ C,D,r3"""
         assert engine.graph.number_of_nodes() == 4
         assert engine.graph.number_of_edges() == 3
 
-    def test_export_empty_graph(self):
+    @pytest.mark.parametrize("format_name", ["json", "csv", "dot", "graphml"])
+    def test_export_empty_graph(self, empty_engine, format_name):
         """Test exporting an empty graph."""
-        engine = GraphEngine()
+        content = empty_engine.export_graph(format_name)
+        assert content is not None
 
-        for format_name in ["json", "csv", "dot", "graphml"]:
-            content = engine.export_graph(format_name)
-            assert content is not None
-
-            # Should be able to import back
-            engine2 = GraphEngine()
-            result = engine2.import_graph(format_name, content)
-            assert result["nodes_added"] == 0
-            assert result["edges_added"] == 0
+        # Should be able to import back
+        engine2 = GraphEngine()
+        result = engine2.import_graph(format_name, content)
+        assert result["nodes_added"] == 0
+        assert result["edges_added"] == 0
 
 
 class TestMermaidFormat:
@@ -455,11 +573,11 @@ class TestMermaidFormat:
         engine.add_edge("A", "B", "connects")
         engine.add_edge("B", "C", "links")
 
-        result = engine.export_graph("mermaid")
+        lines = line_set(engine.export_graph("mermaid"))
 
-        assert "graph TD" in result
-        assert "A -->|connects| B" in result
-        assert "B -->|links| C" in result
+        assert "graph TD" in lines
+        assert "A -->|connects| B" in lines
+        assert "B -->|links| C" in lines
 
     def test_export_mermaid_empty(self):
         """Test Mermaid export of empty graph."""
@@ -474,13 +592,11 @@ class TestMermaidFormat:
         engine.add_node("Auth Service")
         engine.add_edge("User Service", "Auth Service", "calls")
 
-        result = engine.export_graph("mermaid")
+        lines = line_set(engine.export_graph("mermaid"))
 
-        assert "graph TD" in result
+        assert "graph TD" in lines
         # Should have bracket syntax for labels with spaces
-        assert 'User_Service["User Service"]' in result
-        assert 'Auth_Service["Auth Service"]' in result
-        assert "calls" in result
+        assert 'User_Service["User Service"] -->|calls| Auth_Service["Auth Service"]' in lines
 
     def test_export_mermaid_special_chars_in_relation(self):
         """Test Mermaid export with pipe in relation."""
@@ -489,11 +605,10 @@ class TestMermaidFormat:
         engine.add_node("B")
         engine.add_edge("A", "B", "read|write")
 
-        result = engine.export_graph("mermaid")
+        lines = line_set(engine.export_graph("mermaid"))
 
         # Pipe should be escaped
-        assert "&#124;" in result
-        assert "read&#124;write" in result
+        assert "A -->|read&#124;write| B" in lines
 
     def test_mermaid_roundtrip(self):
         """Test import then export preserves structure."""
@@ -505,25 +620,19 @@ class TestMermaidFormat:
         engine.add_edge("A", "B", "calls")
 
         # Export
-        result = engine.export_graph("mermaid")
+        lines = line_set(engine.export_graph("mermaid"))
 
         # Should have expected structure
-        assert "graph TD" in result
-        assert "A" in result
-        assert "B" in result
-        assert "calls" in result
-        assert "-->" in result
+        assert "graph TD" in lines
+        assert "A -->|calls| B" in lines
 
 
 class TestFileBasedImport:
     """Tests for file-based import functionality."""
 
-    def test_import_from_file_reads_content(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_import_from_file_reads_content(self, tmp_path):
         """Test that importing from a file reads the file content."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-        import json
-
         # Create a test file with graph data
         file_path = tmp_path / "test_import.json"
         test_data = {
@@ -535,14 +644,14 @@ class TestFileBasedImport:
                 {"source": "A", "target": "B", "relation": "calls"}
             ]
         }
-        file_path.write_text(json.dumps(test_data), encoding="utf-8")
+        file_path.write_bytes(dump_json(test_data))
 
         # Import from file
         server = GraphServer()
-        result = asyncio.run(server._handle_tool("import_graph", {
+        result = await server._handle_tool("import_graph", {
             "format": "json",
             "file_path": str(file_path)
-        }))
+        })
 
         # Verify import succeeded
         assert result["nodes_added"] == 2
@@ -555,22 +664,19 @@ class TestFileBasedImport:
         assert "B" in graph.graph
         assert graph.graph.nodes["A"]["type"] == "class"
 
-    def test_import_without_file_path_uses_content(self):
+    @pytest.mark.asyncio
+    async def test_import_without_file_path_uses_content(self):
         """Test that import without file_path uses content parameter (existing behavior)."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-        import json
-
         # Import with content parameter
         server = GraphServer()
         test_data = {
             "nodes": [{"label": "X"}, {"label": "Y"}],
             "edges": [{"source": "X", "target": "Y", "relation": "links"}]
         }
-        result = asyncio.run(server._handle_tool("import_graph", {
+        result = await server._handle_tool("import_graph", {
             "format": "json",
-            "content": json.dumps(test_data)
-        }))
+            "content": dump_json(test_data).decode("utf-8")
+        })
 
         # Verify import succeeded
         assert result["nodes_added"] == 2
@@ -582,134 +688,79 @@ class TestFileBasedImport:
         assert "X" in graph.graph
         assert "Y" in graph.graph
 
-    def test_import_with_both_file_path_and_content_raises_error(self):
+    @pytest.mark.asyncio
+    async def test_import_with_both_file_path_and_content_raises_error(self):
         """Test that providing both file_path and content raises ValueError."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-
         server = GraphServer()
         with pytest.raises(ValueError, match="Provide either file_path or content, not both"):
-            asyncio.run(server._handle_tool("import_graph", {
+            await server._handle_tool("import_graph", {
                 "format": "json",
                 "file_path": "/some/path.json",
                 "content": '{"nodes": [], "edges": []}'
-            }))
+            })
 
-    def test_import_with_neither_file_path_nor_content_raises_error(self):
+    @pytest.mark.asyncio
+    async def test_import_with_neither_file_path_nor_content_raises_error(self):
         """Test that providing neither file_path nor content raises ValueError."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-
         server = GraphServer()
         with pytest.raises(ValueError, match="Must provide either file_path or content"):
-            asyncio.run(server._handle_tool("import_graph", {
+            await server._handle_tool("import_graph", {
                 "format": "json"
-            }))
+            })
 
-    def test_import_from_nonexistent_file_raises_error(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_import_from_nonexistent_file_raises_error(self, tmp_path):
         """Test that importing from a nonexistent file raises FileNotFoundError."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-
         server = GraphServer()
         nonexistent_path = tmp_path / "does_not_exist.json"
 
         with pytest.raises(FileNotFoundError, match="File not found"):
-            asyncio.run(server._handle_tool("import_graph", {
+            await server._handle_tool("import_graph", {
                 "format": "json",
                 "file_path": str(nonexistent_path)
-            }))
+            })
 
-    def test_import_from_directory_raises_error(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_import_from_directory_raises_error(self, tmp_path):
         """Test that importing from a directory raises ValueError."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-
         server = GraphServer()
 
         with pytest.raises(ValueError, match="Path is not a file"):
-            asyncio.run(server._handle_tool("import_graph", {
+            await server._handle_tool("import_graph", {
                 "format": "json",
                 "file_path": str(tmp_path)
-            }))
-
-    def test_import_from_file_all_formats(self, tmp_path):
+            })
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("fmt,payload,nodes_added,edges_added", [
+        ("json", _JSON_BASIC, 1, 0),
+        ("csv", _CSV_BASIC, 2, 1),
+        ("dot", _DOT_BASIC, 2, 1),
+        ("graphml", _GRAPHML_BASIC, 2, 1),
+    ])
+    async def test_import_from_file_all_formats(
+        self, tmp_path, fmt, payload, nodes_added, edges_added
+    ):
         """Test that import from file works with all supported formats."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-        import json
-
-        # Test JSON format
-        json_path = tmp_path / "test.json"
-        json_path.write_text(json.dumps({
-            "nodes": [{"label": "A"}],
-            "edges": []
-        }), encoding="utf-8")
+        file_path = tmp_path / f"test.{fmt}"
+        file_path.write_bytes(payload)
 
         server = GraphServer()
-        result = asyncio.run(server._handle_tool("import_graph", {
-            "format": "json",
-            "file_path": str(json_path)
-        }))
-        assert result["nodes_added"] == 1
-        assert result["source"] == f"file '{json_path}'"
-
-        # Test CSV format
-        csv_path = tmp_path / "test.csv"
-        csv_path.write_text("source,target,relation\nA,B,calls\n", encoding="utf-8")
-
-        server2 = GraphServer()
-        result = asyncio.run(server2._handle_tool("import_graph", {
-            "format": "csv",
-            "file_path": str(csv_path)
-        }))
-        assert result["nodes_added"] == 2
-        assert result["edges_added"] == 1
-        assert result["source"] == f"file '{csv_path}'"
-
-        # Test DOT format
-        dot_path = tmp_path / "test.dot"
-        dot_path.write_text("digraph test { A -> B; }", encoding="utf-8")
-
-        server3 = GraphServer()
-        result = asyncio.run(server3._handle_tool("import_graph", {
-            "format": "dot",
-            "file_path": str(dot_path)
-        }))
-        assert result["nodes_added"] == 2
-        assert result["edges_added"] == 1
-        assert result["source"] == f"file '{dot_path}'"
-
-        # Test GraphML format
-        graphml_path = tmp_path / "test.graphml"
-        graphml_path.write_text("""<?xml version="1.0" encoding="UTF-8"?>
-<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
-  <graph edgedefault="directed">
-    <node id="A"/>
-    <node id="B"/>
-    <edge source="A" target="B"/>
-  </graph>
-</graphml>""", encoding="utf-8")
-
-        server4 = GraphServer()
-        result = asyncio.run(server4._handle_tool("import_graph", {
-            "format": "graphml",
-            "file_path": str(graphml_path)
-        }))
-        assert result["nodes_added"] == 2
-        assert result["edges_added"] == 1
-        assert result["source"] == f"file '{graphml_path}'"
+        result = await server._handle_tool("import_graph", {
+            "format": fmt,
+            "file_path": str(file_path)
+        })
+        assert result["nodes_added"] == nodes_added
+        assert result["edges_added"] == edges_added
+        assert result["source"] == f"file '{file_path}'"
 
 
 class TestFileBasedExport:
     """Tests for file-based export functionality."""
 
-    def test_export_to_file_creates_file_with_correct_content(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_export_to_file_creates_file_with_correct_content(self, tmp_path):
         """Test that exporting to a file creates the file with correct content."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-        import json
-
         # Create a graph with some content
         server = GraphServer()
         graph = server.session_manager.get_graph("default")
@@ -719,10 +770,10 @@ class TestFileBasedExport:
 
         # Export to file
         file_path = tmp_path / "test_export.json"
-        result = asyncio.run(server._handle_tool("export_graph", {
+        result = await server._handle_tool("export_graph", {
             "format": "json",
             "file_path": str(file_path)
-        }))
+        })
 
         # Verify result contains metadata, not content
         assert "file_path" in result
@@ -736,19 +787,15 @@ class TestFileBasedExport:
         assert file_path.exists()
 
         # Verify file content is correct
-        content = file_path.read_text(encoding="utf-8")
-        data = json.loads(content)
+        data = load_json(file_path.read_bytes())
         assert "nodes" in data
         assert "edges" in data
         assert len(data["nodes"]) == 2
         assert len(data["edges"]) == 1
 
-    def test_export_without_file_path_returns_content_inline(self):
+    @pytest.mark.asyncio
+    async def test_export_without_file_path_returns_content_inline(self):
         """Test that export without file_path returns content inline (existing behavior)."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-        import json
-
         # Create a graph with some content
         server = GraphServer()
         graph = server.session_manager.get_graph("default")
@@ -757,9 +804,9 @@ class TestFileBasedExport:
         graph.add_edge("A", "B", "calls")
 
         # Export without file_path
-        result = asyncio.run(server._handle_tool("export_graph", {
+        result = await server._handle_tool("export_graph", {
             "format": "json"
-        }))
+        })
 
         # Verify result contains content, not metadata
         assert "content" in result
@@ -767,17 +814,15 @@ class TestFileBasedExport:
         assert "bytes_written" not in result
 
         # Verify content is correct
-        data = json.loads(result["content"])
+        data = load_json(result["content"])
         assert "nodes" in data
         assert "edges" in data
         assert len(data["nodes"]) == 2
         assert len(data["edges"]) == 1
 
-    def test_export_to_file_creates_parent_directories(self, tmp_path):
+    @pytest.mark.asyncio
+    async def test_export_to_file_creates_parent_directories(self, tmp_path):
         """Test that export to file creates parent directories if needed."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-
         # Create a graph
         server = GraphServer()
         graph = server.session_manager.get_graph("default")
@@ -787,10 +832,10 @@ class TestFileBasedExport:
 
         # Export to a nested path that doesn't exist yet
         nested_path = tmp_path / "subdir1" / "subdir2" / "export.csv"
-        result = asyncio.run(server._handle_tool("export_graph", {
+        result = await server._handle_tool("export_graph", {
             "format": "csv",
             "file_path": str(nested_path)
-        }))
+        })
 
         # Verify directories were created
         assert nested_path.parent.exists()
@@ -800,33 +845,22 @@ class TestFileBasedExport:
         assert result["file_path"] == str(nested_path)
         assert result["format"] == "csv"
 
-    def test_export_to_file_all_formats(self, tmp_path):
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("fmt", ["json", "csv", "dot", "graphml", "mermaid"])
+    async def test_export_to_file_all_formats(self, links_server, tmp_path, fmt):
         """Test that export to file works with all supported formats."""
-        from src.mcp_graph_engine.server import GraphServer
-        import asyncio
-
-        formats = ["json", "csv", "dot", "graphml", "mermaid"]
-
-        for fmt in formats:
-            # Create a fresh graph for each format
-            server = GraphServer()
-            graph = server.session_manager.get_graph("default")
-            graph.add_node("X")
-            graph.add_node("Y")
-            graph.add_edge("X", "Y", "links")
-
-            # Export to file
-            file_path = tmp_path / f"test_export.{fmt}"
-            result = asyncio.run(server._handle_tool("export_graph", {
-                "format": fmt,
-                "file_path": str(file_path)
-            }))
-
-            # Verify file was created
-            assert file_path.exists(), f"File not created for format: {fmt}"
-            assert result["format"] == fmt
-            assert result["bytes_written"] > 0
-
-            # Verify content is not empty
-            content = file_path.read_text(encoding="utf-8")
-            assert len(content) > 0, f"Empty content for format: {fmt}"
+
+        # Export to file
+        file_path = tmp_path / f"test_export.{fmt}"
+        result = await links_server._handle_tool("export_graph", {
+            "format": fmt,
+            "file_path": str(file_path)
+        })
+
+        # Verify file was created
+        assert file_path.exists()
+        assert result["format"] == fmt
+        assert result["bytes_written"] > 0
+
+        # Verify content is not empty
+        assert len(file_path.read_bytes()) > 0
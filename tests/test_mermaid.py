@@ -1,283 +1,32 @@
-"""Tests for create_from_mermaid tool - Mermaid flowchart parsing."""
+"""Tests for create_from_mermaid tool - creating graphs from Mermaid flowcharts."""
 
 import pytest
+import src.mcp_graph_engine.server as server_module
 from src.mcp_graph_engine.graph_engine import GraphEngine
 from src.mcp_graph_engine.session import SessionManager
-from src.mcp_graph_engine.server import GraphServer, parse_mermaid
+from src.mcp_graph_engine.server import GraphServer
+from tests.helpers import edge_relations
 
 
-class TestMermaidParser:
-    """Test the Mermaid parser function."""
+@pytest.fixture(scope="module")
+def shared_server():
+    """Create one server for the module; tests get it back with no graphs."""
+    return GraphServer()
 
-    def test_parse_simple_edge(self):
-        """Test parsing a simple edge without labels."""
-        mermaid = """
-graph TD
-    A --> B
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0] == {
-            "from": "A",
-            "to": "B",
-            "rel": "relates_to"  # Default relation
-        }
-
-    def test_parse_edge_with_label(self):
-        """Test parsing an edge with a label."""
-        mermaid = """
-graph TD
-    A -->|depends_on| B
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0] == {
-            "from": "A",
-            "to": "B",
-            "rel": "depends_on"
-        }
-
-    def test_parse_node_with_brackets(self):
-        """Test parsing nodes with display labels in brackets."""
-        mermaid = """
-graph TD
-    A[AuthService] --> B[UserRepository]
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0] == {
-            "from": "AuthService",
-            "to": "UserRepository",
-            "rel": "relates_to"
-        }
-
-    def test_parse_node_with_brackets_and_edge_label(self):
-        """Test parsing nodes with display labels and edge label."""
-        mermaid = """
-graph TD
-    A[AuthService] -->|depends_on| B[UserRepository]
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0] == {
-            "from": "AuthService",
-            "to": "UserRepository",
-            "rel": "depends_on"
-        }
-
-    def test_parse_node_with_parentheses(self):
-        """Test parsing nodes with rounded brackets (parentheses)."""
-        mermaid = """
-graph TD
-    A(Start) --> B(End)
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0] == {
-            "from": "Start",
-            "to": "End",
-            "rel": "relates_to"
-        }
-
-    def test_parse_node_with_braces(self):
-        """Test parsing nodes with diamond shape (braces)."""
-        mermaid = """
-graph TD
-    A{Decision} --> B[Action]
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0] == {
-            "from": "Decision",
-            "to": "Action",
-            "rel": "relates_to"
-        }
-
-    def test_parse_multiple_edges(self):
-        """Test parsing multiple edges."""
-        mermaid = """
-graph TD
-    A --> B
-    B --> C
-    C --> D
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 3
-        assert facts[0]["from"] == "A"
-        assert facts[0]["to"] == "B"
-        assert facts[1]["from"] == "B"
-        assert facts[1]["to"] == "C"
-        assert facts[2]["from"] == "C"
-        assert facts[2]["to"] == "D"
-
-    def test_parse_complex_diagram(self):
-        """Test parsing a complex diagram with mixed syntax."""
-        mermaid = """
-graph TD
-    A[AuthService] -->|depends_on| B[UserRepository]
-    B -->|depends_on| C[DatabasePool]
-    D(ConfigLoader) -->|configures| C
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 3
-        assert facts[0] == {
-            "from": "AuthService",
-            "to": "UserRepository",
-            "rel": "depends_on"
-        }
-        assert facts[1] == {
-            "from": "UserRepository",
-            "to": "DatabasePool",
-            "rel": "depends_on"
-        }
-        assert facts[2] == {
-            "from": "ConfigLoader",
-            "to": "DatabasePool",
-            "rel": "configures"
-        }
-
-    def test_parse_direction_lr(self):
-        """Test that different direction markers work."""
-        mermaid = """
-graph LR
-    A --> B
-    B --> C
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 2
-        assert facts[0]["from"] == "A"
-        assert facts[1]["from"] == "B"
-
-    def test_parse_flowchart_keyword(self):
-        """Test using 'flowchart' instead of 'graph'."""
-        mermaid = """
-flowchart TD
-    A --> B
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 1
-        assert facts[0]["from"] == "A"
-
-    def test_parse_empty_string(self):
-        """Test parsing empty string."""
-        mermaid = ""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 0
-
-    def test_parse_only_graph_declaration(self):
-        """Test parsing with only graph declaration."""
-        mermaid = """
-graph TD
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 0
-
-    def test_parse_ignores_comments(self):
-        """Test that Mermaid comments are ignored."""
-        mermaid = """
-graph TD
-    %% This is a comment
-    A --> B
-    %% Another comment
-    B --> C
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 2
-        assert facts[0]["from"] == "A"
-        assert facts[1]["from"] == "B"
-
-    def test_parse_ignores_empty_lines(self):
-        """Test that empty lines are ignored."""
-        mermaid = """
-graph TD
-
-    A --> B
-
-
-    B --> C
-
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 2
-
-    def test_parse_whitespace_handling(self):
-        """Test that leading/trailing whitespace is handled."""
-        mermaid = """
-graph TD
-  A --> B
-    B --> C
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 2
 
-    def test_parse_different_arrow_styles(self):
-        """Test different arrow styles (-->, ---, etc.)."""
-        mermaid = """
-graph TD
-    A --> B
-    C --- D
-"""
-        facts = parse_mermaid(mermaid)
-
-        # Both should be parsed as edges
-        assert len(facts) == 2
-        assert facts[0]["from"] == "A"
-        assert facts[1]["from"] == "C"
-
-    def test_parse_preserves_label_across_edges(self):
-        """Test that node labels are preserved across multiple edges."""
-        mermaid = """
-graph TD
-    A[Service]
-    A --> B
-    A --> C
-"""
-        facts = parse_mermaid(mermaid)
-
-        # The standalone node declaration should be parsed
-        # and the label should be used in subsequent edges
-        assert len(facts) == 2
-        assert facts[0]["from"] == "Service"
-        assert facts[1]["from"] == "Service"
-
-    def test_parse_reuses_node_labels(self):
-        """Test that node labels defined once are reused."""
-        mermaid = """
-graph TD
-    A[ServiceA] --> B
-    C --> A
-"""
-        facts = parse_mermaid(mermaid)
-
-        assert len(facts) == 2
-        # First edge defines A as ServiceA
-        assert facts[0]["from"] == "ServiceA"
-        # Second edge should reuse ServiceA for A
-        assert facts[1]["to"] == "ServiceA"
+@pytest.fixture
+def server(shared_server):
+    """Shared server, cleared of graphs from earlier tests."""
+    shared_server.session_manager.clear()
+    return shared_server
 
 
 class TestCreateFromMermaidBasic:
     """Test basic create_from_mermaid functionality."""
 
     @pytest.mark.asyncio
-    async def test_create_from_simple_mermaid(self):
+    async def test_create_from_simple_mermaid(self, server):
         """Test creating graph from simple Mermaid diagram."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -293,13 +42,14 @@ graph TD
         assert "A" in graph.graph
         assert "B" in graph.graph
         assert "C" in graph.graph
-        assert graph.graph.has_edge("A", "B")
-        assert graph.graph.has_edge("B", "C")
+        assert edge_relations(graph) == {
+            ("A", "B"): "relates_to",
+            ("B", "C"): "relates_to",
+        }
 
     @pytest.mark.asyncio
-    async def test_create_from_mermaid_with_labels(self):
+    async def test_create_from_mermaid_with_labels(self, server):
         """Test creating graph from Mermaid with node labels."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -313,16 +63,13 @@ graph TD
         graph = server.session_manager.get_graph("default")
         assert "AuthService" in graph.graph
         assert "UserRepository" in graph.graph
-        assert graph.graph.has_edge("AuthService", "UserRepository")
 
         # Check edge has correct relation type
-        edge_data = graph.graph.get_edge_data("AuthService", "UserRepository")
-        assert edge_data["relation"] == "depends_on"
+        assert edge_relations(graph) == {("AuthService", "UserRepository"): "depends_on"}
 
     @pytest.mark.asyncio
-    async def test_create_from_mermaid_default_relation(self):
+    async def test_create_from_mermaid_default_relation(self, server):
         """Test that edges without labels get default relation."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -335,9 +82,8 @@ graph TD
         assert edge_data["relation"] == "relates_to"
 
     @pytest.mark.asyncio
-    async def test_create_from_mermaid_complex(self):
+    async def test_create_from_mermaid_complex(self, server):
         """Test creating a complex dependency graph from Mermaid."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -351,14 +97,15 @@ graph TD
         assert result["edges_created"] == 3
 
         graph = server.session_manager.get_graph("default")
-        assert graph.graph.has_edge("AuthService", "UserRepository")
-        assert graph.graph.has_edge("UserRepository", "DatabasePool")
-        assert graph.graph.has_edge("ConfigLoader", "DatabasePool")
+        assert edge_relations(graph) == {
+            ("AuthService", "UserRepository"): "depends_on",
+            ("UserRepository", "DatabasePool"): "depends_on",
+            ("ConfigLoader", "DatabasePool"): "configures",
+        }
 
     @pytest.mark.asyncio
-    async def test_create_from_mermaid_empty(self):
+    async def test_create_from_mermaid_empty(self, server):
         """Test creating from empty Mermaid diagram."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -367,16 +114,16 @@ graph TD
 
         assert result["nodes_created"] == 0
         assert result["edges_created"] == 0
+        assert result["nodes_existed"] == 0
+        assert result["edges_existed"] == 0
 
 
 class TestCreateFromMermaidIdempotency:
     """Test that create_from_mermaid is idempotent."""
 
     @pytest.mark.asyncio
-    async def test_creating_same_mermaid_twice(self):
+    async def test_creating_same_mermaid_twice(self, server):
         """Test that creating the same diagram twice is idempotent."""
-        server = GraphServer()
-
         mermaid = """
 graph TD
     A --> B
@@ -400,14 +147,57 @@ graph TD
         assert result2["edges_created"] == 0
         assert result2["edges_existed"] == 2
 
+    @pytest.mark.asyncio
+    async def test_same_mermaid_after_graph_changes(self, server):
+        """Test that a repeated diagram is re-applied once the graph has changed."""
+        mermaid = """
+graph TD
+    A --> B
+    B --> C
+"""
+        await server._handle_tool("create_from_mermaid", {"mermaid": mermaid})
+        await server._handle_tool("forget", {"label": "C"})
+
+        result = await server._handle_tool("create_from_mermaid", {
+            "mermaid": mermaid
+        })
+        assert result["nodes_created"] == 1
+        assert result["nodes_existed"] == 3
+        assert result["edges_created"] == 1
+        assert result["edges_existed"] == 1
+
+        graph = server.session_manager.get_graph("default")
+        assert graph.graph.has_edge("B", "C")
+
+    @pytest.mark.asyncio
+    async def test_same_mermaid_into_recreated_graph(self, server):
+        """Test that a repeated diagram is applied to a new graph with the same name and version."""
+        mermaid = """
+graph TD
+    A --> B
+"""
+        await server._handle_tool("create_from_mermaid", {"mermaid": mermaid})
+        version = server.session_manager.get_graph("default").version
+
+        server.session_manager.delete_graph("default")
+        graph = server.session_manager.get_graph("default")
+        # Same version, as when the engine is imported under two module names
+        graph._version = version
+
+        result = await server._handle_tool("create_from_mermaid", {
+            "mermaid": mermaid
+        })
+        assert result["nodes_created"] == 2
+        assert result["edges_created"] == 1
+        assert graph.graph.has_edge("A", "B")
+
 
 class TestCreateFromMermaidEdgeCases:
     """Test edge cases and special scenarios."""
 
     @pytest.mark.asyncio
-    async def test_mermaid_with_self_loop(self):
+    async def test_mermaid_with_self_loop(self, server):
         """Test that a node can reference itself."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -422,9 +212,8 @@ graph TD
         assert graph.graph.has_edge("A", "A")
 
     @pytest.mark.asyncio
-    async def test_mermaid_multiple_edges_same_nodes(self):
+    async def test_mermaid_multiple_edges_same_nodes(self, server):
         """Test multiple edges between same nodes - second one overwrites first."""
-        server = GraphServer()
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -448,10 +237,8 @@ class TestCreateFromMermaidMultiGraph:
     """Test create_from_mermaid with multiple named graphs."""
 
     @pytest.mark.asyncio
-    async def test_mermaid_in_different_graphs(self):
+    async def test_mermaid_in_different_graphs(self, server):
         """Test that Mermaid diagrams are isolated to named graphs."""
-        server = GraphServer()
-
         # Add to graph1
         await server._handle_tool("create_from_mermaid", {
             "graph": "graph1",
@@ -480,10 +267,8 @@ graph TD
         assert "X" not in graph1.graph
 
     @pytest.mark.asyncio
-    async def test_mermaid_default_graph(self):
+    async def test_mermaid_default_graph(self, server):
         """Test that Mermaid goes to 'default' graph when not specified."""
-        server = GraphServer()
-
         await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -499,10 +284,8 @@ class TestCreateFromMermaidIntegration:
     """Integration tests combining create_from_mermaid with other tools."""
 
     @pytest.mark.asyncio
-    async def test_mermaid_then_query(self):
+    async def test_mermaid_then_query(self, server):
         """Test creating from Mermaid and then querying the graph."""
-        server = GraphServer()
-
         await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -521,10 +304,8 @@ graph TD
         assert result["length"] == 3
 
     @pytest.mark.asyncio
-    async def test_mermaid_then_get_info(self):
+    async def test_mermaid_then_get_info(self, server):
         """Test that get_graph_info reflects Mermaid-created graph."""
-        server = GraphServer()
-
         await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -539,10 +320,8 @@ graph TD
         assert info["edge_count"] == 2
 
     @pytest.mark.asyncio
-    async def test_mermaid_creates_cycle(self):
+    async def test_mermaid_creates_cycle(self, server):
         """Test creating a cycle via Mermaid."""
-        server = GraphServer()
-
         await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -557,10 +336,8 @@ graph TD
         assert len(result["cycles"]) > 0
 
     @pytest.mark.asyncio
-    async def test_mixed_add_facts_and_mermaid(self):
+    async def test_mixed_add_facts_and_mermaid(self, server):
         """Test that add_facts and create_from_mermaid work together."""
-        server = GraphServer()
-
         # Add via Mermaid
         await server._handle_tool("create_from_mermaid", {
             "mermaid": """
@@ -578,8 +355,10 @@ graph TD
 
         # Verify both are in the graph
         graph = server.session_manager.get_graph("default")
-        assert graph.graph.has_edge("A", "B")
-        assert graph.graph.has_edge("B", "C")
+        assert edge_relations(graph) == {
+            ("A", "B"): "relates_to",
+            ("B", "C"): "connects",
+        }
 
         # Verify path works
         result = await server._handle_tool("shortest_path", {
@@ -593,10 +372,8 @@ class TestCreateFromMermaidRealWorldScenarios:
     """Test real-world usage scenarios."""
 
     @pytest.mark.asyncio
-    async def test_mermaid_service_architecture(self):
+    async def test_mermaid_service_architecture(self, server):
         """Test creating a service architecture diagram from Mermaid."""
-        server = GraphServer()
-
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -616,10 +393,8 @@ graph TD
         assert info["edge_count"] == 5
 
     @pytest.mark.asyncio
-    async def test_mermaid_decision_flow(self):
+    async def test_mermaid_decision_flow(self, server):
         """Test creating a decision flow diagram from Mermaid."""
-        server = GraphServer()
-
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph TD
@@ -634,17 +409,15 @@ graph TD
 
         graph = server.session_manager.get_graph("default")
         # Check that edge labels became relation types
-        edge_data1 = graph.graph.get_edge_data("Check Auth", "Show Dashboard")
-        assert edge_data1["relation"] == "authenticated"
-
-        edge_data2 = graph.graph.get_edge_data("Check Auth", "Show Login")
-        assert edge_data2["relation"] == "not_authenticated"
+        assert edge_relations(graph) == {
+            ("Check Auth", "Show Dashboard"): "authenticated",
+            ("Check Auth", "Show Login"): "not_authenticated",
+            ("Show Login", "Show Dashboard"): "success",
+        }
 
     @pytest.mark.asyncio
-    async def test_mermaid_data_pipeline(self):
+    async def test_mermaid_data_pipeline(self, server):
         """Test creating a data pipeline diagram from Mermaid."""
-        server = GraphServer()
-
         result = await server._handle_tool("create_from_mermaid", {
             "mermaid": """
 graph LR
@@ -665,3 +438,31 @@ graph LR
         })
         assert result["length"] == 4
         assert len(result["path"]) == 5
+
+
+class TestCreateFromMermaidPreload:
+    """Test diagrams preloaded when the server starts."""
+
+    @pytest.mark.asyncio
+    async def test_preloaded_mermaid_is_not_reparsed(self, monkeypatch):
+        """Test that a preloaded diagram imports without calling the parser."""
+        mermaid = """
+graph TD
+    API[API Gateway] -->|routes_to| Auth[Auth Service]
+    Auth -->|depends_on| DB[Database]
+"""
+        server = GraphServer(preload_mermaid=[mermaid])
+
+        def fail_parse(text):
+            raise AssertionError("preloaded diagram was parsed again")
+
+        monkeypatch.setattr(server_module, "_parse_mermaid_cached", fail_parse)
+
+        result = await server._handle_tool("create_from_mermaid", {
+            "mermaid": mermaid
+        })
+
+        assert result["nodes_created"] == 3
+        assert result["edges_created"] == 2
+        graph = server.session_manager.get_graph("default")
+        assert graph.graph["API Gateway"]["Auth Service"]["relation"] == "routes_to"
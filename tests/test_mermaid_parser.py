@@ -0,0 +1,153 @@
+"""Tests for the Mermaid flowchart parser."""
+
+import pytest
+from src.mcp_graph_engine.server import iter_parse_mermaid, parse_mermaid
+
+# (Mermaid text, expected (from, to, rel) facts in order)
+MERMAID_CASES = [
+    pytest.param("""
+graph TD
+    A --> B
+""", [("A", "B", "relates_to")], id="simple_edge"),  # Default relation
+    pytest.param("""
+graph TD
+    A -->|depends_on| B
+""", [("A", "B", "depends_on")], id="edge_with_label"),
+    pytest.param("""
+graph TD
+    A[AuthService] --> B[UserRepository]
+""", [("AuthService", "UserRepository", "relates_to")], id="node_with_brackets"),
+    pytest.param("""
+graph TD
+    A[AuthService] -->|depends_on| B[UserRepository]
+""", [("AuthService", "UserRepository", "depends_on")], id="node_with_brackets_and_edge_label"),
+    pytest.param("""
+graph TD
+    A(Start) --> B(End)
+""", [("Start", "End", "relates_to")], id="node_with_parentheses"),
+    pytest.param("""
+graph TD
+    A{Decision} --> B[Action]
+""", [("Decision", "Action", "relates_to")], id="node_with_braces"),
+    pytest.param("""
+graph TD
+    A --> B
+    B --> C
+    C --> D
+""", [("A", "B", "relates_to"), ("B", "C", "relates_to"), ("C", "D", "relates_to")],
+        id="multiple_edges"),
+    pytest.param("""
+graph TD
+    A[AuthService] -->|depends_on| B[UserRepository]
+    B -->|depends_on| C[DatabasePool]
+    D(ConfigLoader) -->|configures| C
+""", [
+        ("AuthService", "UserRepository", "depends_on"),
+        ("UserRepository", "DatabasePool", "depends_on"),
+        ("ConfigLoader", "DatabasePool", "configures"),
+    ], id="complex_diagram"),
+    pytest.param("""
+graph LR
+    A --> B
+    B --> C
+""", [("A", "B", "relates_to"), ("B", "C", "relates_to")], id="direction_lr"),
+    pytest.param("""
+flowchart TD
+    A --> B
+""", [("A", "B", "relates_to")], id="flowchart_keyword"),
+    pytest.param("", [], id="empty_string"),
+    pytest.param("""
+graph TD
+""", [], id="only_graph_declaration"),
+    pytest.param("""
+graph TD
+    %% This is a comment
+    A --> B
+    %% Another comment
+    B --> C
+""", [("A", "B", "relates_to"), ("B", "C", "relates_to")], id="ignores_comments"),
+    pytest.param("""
+graph TD
+
+    A --> B
+
+
+    B --> C
+
+""", [("A", "B", "relates_to"), ("B", "C", "relates_to")], id="ignores_empty_lines"),
+    pytest.param("""
+graph TD
+  A --> B
+    B --> C
+""", [("A", "B", "relates_to"), ("B", "C", "relates_to")], id="whitespace_handling"),
+    # Both arrow styles are parsed as edges
+    pytest.param("""
+graph TD
+    A --> B
+    C --- D
+""", [("A", "B", "relates_to"), ("C", "D", "relates_to")], id="different_arrow_styles"),
+    # A standalone node declaration labels the node in later edges
+    pytest.param("""
+graph TD
+    A[Service]
+    A --> B
+    A --> C
+""", [("Service", "B", "relates_to"), ("Service", "C", "relates_to")],
+        id="preserves_label_across_edges"),
+    # A label defined on an edge is reused when the node appears again
+    pytest.param("""
+graph TD
+    A[ServiceA] --> B
+    C --> A
+""", [("ServiceA", "B", "relates_to"), ("C", "ServiceA", "relates_to")],
+        id="reuses_node_labels"),
+    # An unterminated label or dangling arrow stays on its line
+    pytest.param("""
+graph TD
+    A[Unclosed --> B
+    C -->
+    D
+    E --> F]
+""", [("E", "F", "relates_to")], id="statements_do_not_span_lines"),
+    # Plain edges take a split-based fast path that must agree with the regex
+    pytest.param("""
+graph TD
+    Auth_2 --- Straße
+    A.b --> C
+    graph --> D
+    E --> F extra
+""", [("Auth_2", "Straße", "relates_to"), ("E", "F", "relates_to")], id="plain_edge_fast_path"),
+]
+
+
+class TestMermaidParser:
+    """Test the Mermaid parser function."""
+
+    @pytest.mark.parametrize("mermaid,expected", MERMAID_CASES)
+    def test_parse(self, mermaid, expected):
+        """Test that each diagram parses to the expected facts."""
+        facts = parse_mermaid(mermaid)
+
+        assert facts == [{"from": f, "to": t, "rel": r} for f, t, r in expected]
+
+    @pytest.mark.parametrize("mermaid,expected", MERMAID_CASES)
+    def test_iter_parse(self, mermaid, expected):
+        """Test that the streaming parser yields the same facts as tuples."""
+        facts = iter_parse_mermaid(mermaid)
+
+        assert iter(facts) is facts
+        assert list(facts) == expected
+
+    def test_parse_repeated_input_returns_fresh_facts(self):
+        """Test that re-parsing cached input returns equal but independent facts."""
+        mermaid = """
+graph TD
+    A -->|calls| B
+"""
+        first = parse_mermaid(mermaid)
+        first[0]["rel"] = "mutated"
+        first.append({"from": "X", "to": "Y", "rel": "extra"})
+
+        second = parse_mermaid(mermaid)
+
+        assert second == [{"from": "A", "to": "B", "rel": "calls"}]